@@ -5,14 +5,24 @@ Batch audio splitting tool driven by mapping files. Built for repeatable
 segmentation and naming of narration or voice assets in production workflows.
 """
 
-import subprocess
+import fnmatch
+import json
 import math
+import mmap
 import re
 import os
 import sys
+import multiprocessing
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tkinter import messagebox, ttk, filedialog
 
+# Shared helpers live in scripts/common, one level above this script's folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import audio_probe, wav_io
+from common.ffmpeg_jobs import FFmpegError, run_job
+from common.file_hash import file_sha256
+
 # Determine the base directory (whether running from source or from the packaged app)
 if getattr(sys, 'frozen', False):
     base_dir = sys._MEIPASS  # Temporary directory where PyInstaller unpacks the app
@@ -22,115 +32,530 @@ else:
 # Default folder (can be updated by user input)
 default_folder = base_dir
 
-# File mappings (updated dynamically based on the selected folder)
+# Default discovery rules: source WAV glob patterns in the target folder, each paired
+# with the titles file of the same name in the mappings folder
+DEFAULT_SOURCE_RULES = [('*-SYL.wav', '{stem}.txt'), ('*-SYL_*.wav', '{stem}.txt')]
+
+# Optional rules file in the mappings folder that replaces the defaults. One rule per line:
+#   <source glob>                      pair with <stem>.txt
+#   <source glob> = <titles template>  e.g. "ch*.wav = {stem}_titles.txt" or "intro.wav = intro.txt"
+SOURCE_RULES_FILE = 'sources.txt'
+
+# Function to load discovery rules as (source glob, titles template) pairs. Lines whose
+# template uses anything but {stem} are reported and skipped.
+def load_source_rules(mappings_dir):
+    rules_path = os.path.join(mappings_dir, SOURCE_RULES_FILE)
+    if not os.path.isfile(rules_path):
+        return DEFAULT_SOURCE_RULES
+    rules = []
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            pattern, _, template = line.partition('=')
+            template = template.strip() or '{stem}.txt'
+            try:
+                template.format(stem='')
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"Skipping rule on line {line_number} of {rules_path}: bad titles template "
+                      f"{template!r} ({e!r}); only {{stem}} is allowed")
+                continue
+            rules.append((pattern.strip(), template))
+    return rules
+
+# Function to list the regular file names in a folder with a single scan
+def scan_file_names(folder):
+    try:
+        with os.scandir(folder) as entries:
+            return [entry.name for entry in entries if entry.is_file()]
+    except OSError:
+        return []
+
+# File mappings (updated dynamically based on the selected folder). The target folder and
+# the mappings folder are each scanned once; sources matching a discovery rule are paired
+# with their titles file through a name index. Returns ({name: source path}, {name: titles path}).
 def get_file_mappings(selected_folder):
     mappings_dir = os.path.join(base_dir, 'mappings')  # Always reference 'mappings' from script directory
-    return {
-        '1-SYL.wav': os.path.join(selected_folder, '1-SYL.wav'),
-        '2-SYL_001.wav': os.path.join(selected_folder, '2-SYL_001.wav'),
-        '2-SYL_002.wav': os.path.join(selected_folder, '2-SYL_002.wav'),
-        '2-SYL_003.wav': os.path.join(selected_folder, '2-SYL_003.wav'),
-        '2-SYL_004.wav': os.path.join(selected_folder, '2-SYL_004.wav'),
-        '3-SYL.wav': os.path.join(selected_folder, '3-SYL.wav'),
-        '4-SYL.wav': os.path.join(selected_folder, '4-SYL.wav'),
-    }, {
-        '1-SYL.wav': os.path.join(mappings_dir, '1-SYL.txt'),
-        '2-SYL_001.wav': os.path.join(mappings_dir, '2-SYL_001.txt'),
-        '2-SYL_002.wav': os.path.join(mappings_dir, '2-SYL_002.txt'),
-        '2-SYL_003.wav': os.path.join(mappings_dir, '2-SYL_003.txt'),
-        '2-SYL_004.wav': os.path.join(mappings_dir, '2-SYL_004.txt'),
-        '3-SYL.wav': os.path.join(mappings_dir, '3-SYL.txt'),
-        '4-SYL.wav': os.path.join(mappings_dir, '4-SYL.txt'),
-    }
+    rules = [(re.compile(fnmatch.translate(pattern), re.IGNORECASE), pattern, template)
+             for pattern, template in load_source_rules(mappings_dir)]
+    titles_index = {name.lower(): os.path.join(mappings_dir, name) for name in scan_file_names(mappings_dir)}
+
+    audio_file_mappings = {}
+    title_file_mappings = {}
+
+    def add_source(name, template):
+        stem = os.path.splitext(name)[0]
+        titles_name = template.format(stem=stem)
+        audio_file_mappings[name] = os.path.join(selected_folder, name)
+        title_file_mappings[name] = titles_index.get(titles_name.lower(), os.path.join(mappings_dir, titles_name))
+
+    for name in sorted(scan_file_names(selected_folder)):
+        for regex, _, template in rules:
+            if regex.match(name):
+                add_source(name, template)
+                break
+    # Explicit (non-glob) entries are kept even when missing so they get reported. Names are
+    # compared without case, like the rule match, so a file already found is not added twice.
+    found = {name.lower() for name in audio_file_mappings}
+    for _, pattern, template in rules:
+        if not any(char in pattern for char in '*?[') and pattern.lower() not in found:
+            add_source(pattern, template)
+            found.add(pattern.lower())
+    return audio_file_mappings, title_file_mappings
 
 # Function to sanitize filenames
 def sanitize_filename(name):
     return re.sub(r'[\\/:*?"<>|]', '_', name)
 
-# Function to get the total duration of the audio file using ffprobe
+# Function to get the total duration of the audio file from its header (cached on disk)
 def get_audio_duration(filename):
-    result = subprocess.run(
-        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-         '-of', 'default=noprint_wrappers=1:nokey=1', filename],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT
-    )
-    return float(result.stdout)
+    return audio_probe.probe_audio(filename)['duration']
 
-# Function to split a single audio file into clips
-def split_audio_file(audio_file, titles_file, clip_duration, title_prefix, output_folder):
+# Function to check whether a clip title is a REMOVE placeholder
+def is_remove_title(name):
+    return "REMOVE" in name.upper()
+
+# Function to plan the clips for a single audio file as (start, duration, output_file) tuples.
+# Clips are fixed clip_duration windows unless a list of cut points (in seconds) is given.
+def plan_clips(audio_file, titles_file, clip_duration, title_prefix, output_folder, cut_points=None):
     with open(titles_file, 'r', encoding='utf-8') as f:
         titles = [line.strip() for line in f if line.strip()]
     try:
         total_duration = get_audio_duration(audio_file)
     except Exception as e:
-        print(f"Error retrieving audio duration for {audio_file}: {e}")
-        return
-    num_clips = math.ceil(total_duration / clip_duration)
+        raise ValueError(f"Error retrieving audio duration for {audio_file}: {e}") from e
+    if cut_points is None:
+        num_clips = math.ceil(total_duration / clip_duration)
+        boundaries = [i * clip_duration for i in range(num_clips)] + [total_duration]
+    else:
+        boundaries = [0.0] + [cut for cut in cut_points if 0.0 < cut < total_duration] + [total_duration]
+        num_clips = len(boundaries) - 1
     if num_clips > len(titles):
-        print(f"Error: Not enough titles for the number of clips in {audio_file} ({num_clips} required).")
-        return
+        raise ValueError(f"Error: Not enough titles for the number of clips in {audio_file} ({num_clips} required).")
     base_name = os.path.splitext(os.path.basename(audio_file))[0]
     output_dir = os.path.join(output_folder, base_name)
     os.makedirs(output_dir, exist_ok=True)
+    clips = []
+    holes = 0
     for i in range(num_clips):
-        start_time = i * clip_duration
-        duration = min(clip_duration, total_duration - start_time)
+        start_time = boundaries[i]
+        duration = boundaries[i + 1] - start_time
         sanitized_title = sanitize_filename(f"{title_prefix}{titles[i]}")
+        # REMOVE placeholders are left as holes in the plan so they are never cut
+        if is_remove_title(sanitized_title):
+            holes += 1
+            continue
         output_file = os.path.join(output_dir, f"{sanitized_title}.wav")
+        clips.append((start_time, duration, output_file))
+    if holes:
+        print(f"Skipping {holes} REMOVE placeholders in {audio_file}.")
+    return clips
+
+# ffmpeg runs are given this long, plus FFMPEG_TIMEOUT_PER_SECOND for every second of
+# source audio they have to read, before they are killed
+FFMPEG_TIMEOUT_BASE = 60.0
+FFMPEG_TIMEOUT_PER_SECOND = 0.5
+
+
+class ClipErrors(ValueError):
+    """Some clips of a source could not be cut; ``created`` lists the ones that were."""
+
+    def __init__(self, message, created=()):
+        super().__init__(message, list(created))  # Both in args so the error survives the process pool
+
+    @property
+    def created(self):
+        return self.args[1]
+
+    def __str__(self):
+        return self.args[0]
+
+
+# Function to cut clips with one ffmpeg process per clip (decodes the source once per clip)
+def cut_clips_per_clip(audio_file, clips):
+    created = []
+    failures = []
+    for start_time, duration, output_file in clips:
         command = [
-            'ffmpeg',
             '-y',
             '-i', audio_file,
             '-ss', str(start_time),
             '-t', str(duration),
             output_file
         ]
-        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        try:
+            run_job(command, timeout=FFMPEG_TIMEOUT_BASE + (start_time + duration) * FFMPEG_TIMEOUT_PER_SECOND)
+        except FFmpegError as e:
+            print(f"Error creating clip {output_file}: {e}")
+            failures.append(f"{os.path.basename(output_file)}: {e}")
+            continue
+        except OSError as e:
+            raise ClipErrors(str(e), created) from e  # ffmpeg missing: every other clip would fail too
         print(f"Created clip: {output_file}")
+        created.append(output_file)
+    if failures:
+        raise ClipErrors(f"{len(failures)} clips failed; first: {failures[0]}", created)
+    return created
+
+# Function to group planned clips into runs that are contiguous in the source
+def contiguous_runs(clips):
+    runs = []
+    for clip in clips:
+        if runs and abs(runs[-1][-1][0] + runs[-1][-1][1] - clip[0]) < 1e-6:
+            runs[-1].append(clip)
+        else:
+            runs.append([clip])
+    return runs
+
+# Function to cut clips with one ffmpeg segment-muxer pass per contiguous run of clips
+def cut_clips_single_pass(audio_file, clips):
+    created = []
+    for run in contiguous_runs(clips):
+        try:
+            created.extend(cut_run_single_pass(audio_file, run))
+        except ClipErrors as e:
+            raise ClipErrors(str(e), created + e.created) from e
+    return created
+
+# Function to cut a contiguous run of clips with a single ffmpeg segment-muxer pass.
+# The source is seeked on the input side and decoded once; segments are written to
+# numbered temporary files and then renamed to their titles in order. Segment
+# boundaries land on the source's audio packet grid, use "Per Clip" for exact cuts.
+def cut_run_single_pass(audio_file, clips):
+    if not clips:
+        return []
+    output_dir = os.path.dirname(clips[0][2])
+    first_start = clips[0][0]
+    run_length = clips[-1][0] + clips[-1][1] - first_start
+    segment_pattern = os.path.join(output_dir, f".segment_{os.getpid()}_%06d.wav")
+    command = [
+        '-y',
+        '-ss', str(first_start),
+        '-t', str(run_length),
+        '-i', audio_file,
+        '-f', 'segment',
+        '-reset_timestamps', '1',
+    ]
+    if len(clips) > 1:
+        segment_times = ",".join(f"{start_time - first_start:.6f}" for start_time, _, _ in clips[1:])
+        command += ['-segment_times', segment_times]
+    command.append(segment_pattern)
+    try:
+        run_job(command, timeout=FFMPEG_TIMEOUT_BASE + (first_start + run_length) * FFMPEG_TIMEOUT_PER_SECOND)
+    except (OSError, FFmpegError) as e:
+        # Segments from a failed pass may be cut short, so none of them are kept
+        for i in range(len(clips)):
+            try:
+                os.remove(segment_pattern % i)
+            except OSError:
+                pass
+        raise ClipErrors(f"ffmpeg failed cutting {len(clips)} clips from {audio_file}: {e}") from e
+
+    created = []
+    for i, (_, _, output_file) in enumerate(clips):
+        segment_file = segment_pattern % i
+        if not os.path.isfile(segment_file):
+            print(f"Error: Segment {i} missing for clip {output_file}")
+            continue
+        os.replace(segment_file, output_file)
+        print(f"Created clip: {output_file}")
+        created.append(output_file)
+    return created
+
+# Function to cut clips from an uncompressed WAV in-process. The source is memory-mapped
+# and each clip is written as a fresh WAV header followed by a sample-aligned byte range
+# copied straight from the source data chunk. Compressed or unusual sources fall back
+# to the single-pass ffmpeg engine.
+def cut_clips_native(audio_file, clips):
+    try:
+        info = wav_io.read_wav_info(audio_file)
+    except (OSError, ValueError) as e:
+        print(f"Native split unavailable for {audio_file} ({e}), falling back to ffmpeg.")
+        return cut_clips_single_pass(audio_file, clips)
+    if not info.is_uncompressed:
+        print(f"Native split unavailable for {audio_file} (compressed format), falling back to ffmpeg.")
+        return cut_clips_single_pass(audio_file, clips)
+
+    created = []
+    with open(audio_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            for start_time, duration, output_file in clips:
+                first_frame = min(round(start_time * info.sample_rate), info.num_frames)
+                last_frame = min(round((start_time + duration) * info.sample_rate), info.num_frames)
+                begin = info.data_offset + first_frame * info.block_align
+                end = info.data_offset + last_frame * info.block_align
+                with open(output_file, 'wb') as out:
+                    wav_io.write_wav_header(out, info, end - begin)
+                    out.write(view[begin:end])
+                    wav_io.write_wav_padding(out, end - begin)
+                print(f"Created clip: {output_file}")
+                created.append(output_file)
+    return created
+
+# Available split modes (label shown in the GUI -> cutting function)
+SPLIT_MODES = {
+    "Native WAV": cut_clips_native,
+    "Single Pass": cut_clips_single_pass,
+    "Per Clip": cut_clips_per_clip,
+}
+
+# Function to split a single audio file into clips
+def split_audio_file(audio_file, titles_file, clip_duration, title_prefix, output_folder, split_mode="Native WAV"):
+    clips = plan_clips(audio_file, titles_file, clip_duration, title_prefix, output_folder)
+    return SPLIT_MODES[split_mode](audio_file, clips)
+
+# Smallest clip range handed to a single pool worker
+MIN_CHUNK_CLIPS = 16
+
+# Split manifests are saved after every batch of this many clips so a crash can resume
+MANIFEST_BATCH_CLIPS = 256
+MANIFEST_VERSION = 1
 
-# Function to delete files with "REMOVE" in their filename
+# Function to get the manifest path written beside a source's output folder
+def manifest_path(audio_file, output_folder):
+    base_name = os.path.splitext(os.path.basename(audio_file))[0]
+    return os.path.join(output_folder, f"{base_name}.split.json")
+
+# Function to load a split manifest, returning an empty one when missing or unreadable
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'source': {}, 'clips': {}}
+
+# Function to write a JSON file (split manifest or cut list) atomically
+def write_json_atomic(path, data):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(temp_path, path)
+
+# Function to hash the source, reusing the recorded hash while its size and mtime are unchanged
+def source_sha256(audio_file, manifest):
+    stat_result = os.stat(audio_file)
+    recorded = manifest['source']
+    if recorded.get('size') == stat_result.st_size and recorded.get('mtime_ns') == stat_result.st_mtime_ns:
+        return recorded['sha256']
+    digest = file_sha256(audio_file)
+    manifest['source'] = {'size': stat_result.st_size, 'mtime_ns': stat_result.st_mtime_ns, 'sha256': digest}
+    return digest
+
+# Function to load a source's manifest and drop planned clips that are already up to date.
+# Returns (pending clips, manifest state used by record_clips).
+def filter_current_clips(audio_file, titles_file, clips, clip_duration, title_prefix, output_folder):
+    path = manifest_path(audio_file, output_folder)
+    manifest = load_manifest(path)
+    settings = {
+        'source_sha256': source_sha256(audio_file, manifest),
+        'titles_sha256': file_sha256(titles_file),
+        'clip_duration': clip_duration,
+        'title_prefix': title_prefix,
+    }
+    records = {}
+    pending = []
+    for start_time, duration, output_file in clips:
+        record = dict(settings, start=start_time, duration=duration)
+        records[output_file] = record
+        # A clip's audio only depends on the source and its time range, so a changed
+        # titles file or prefix only re-cuts the clips whose names changed
+        recorded = manifest['clips'].get(os.path.basename(output_file))
+        if (recorded and recorded['source_sha256'] == record['source_sha256']
+                and recorded['start'] == start_time and recorded['duration'] == duration
+                and os.path.isfile(output_file) and os.path.getsize(output_file) == recorded.get('size')):
+            recorded.update(record)
+            continue
+        pending.append((start_time, duration, output_file))
+    return pending, {'path': path, 'manifest': manifest, 'records': records}
+
+# Default settings for silence-aware cut detection (see silence_cuts.find_cut_points)
+DEFAULT_SILENCE_OPTIONS = {'silence_db': -40.0, 'max_shift': 0.5, 'min_silence': 0.05}
+
+# Function to get silence-snapped cut points for a source. Cut lists are stored beside the
+# output folder as <name>.cuts.json and reused while the source and settings are unchanged.
+def get_cut_points(audio_file, clip_duration, output_folder, silence_options):
+    import silence_cuts  # Needs NumPy, which is only required for this mode
+
+    base_name = os.path.splitext(os.path.basename(audio_file))[0]
+    path = os.path.join(output_folder, f"{base_name}.cuts.json")
+    stat_result = os.stat(audio_file)
+    key = dict(silence_options, clip_duration=clip_duration,
+               source_size=stat_result.st_size, source_mtime_ns=stat_result.st_mtime_ns)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cut_list = json.load(f)
+        if cut_list.get('key') == key:
+            print(f"Reusing cut list {path}")
+            return cut_list['cuts']
+    except (OSError, ValueError):
+        pass
+
+    print(f"Analyzing silence in {audio_file}...")
+    cuts = silence_cuts.find_cut_points(audio_file, clip_duration, **silence_options)
+    write_json_atomic(path, {'key': key, 'cuts': cuts})
+    return cuts
+
+# Function to record freshly created clips in their source's manifest and save it
+def record_clips(state, created):
+    for output_file in created:
+        record = dict(state['records'][output_file], size=os.path.getsize(output_file))
+        state['manifest']['clips'][os.path.basename(output_file)] = record
+    write_json_atomic(state['path'], state['manifest'])
+
+# Function run inside a pool worker to cut one clip range of one source
+def cut_clip_chunk(audio_file, clips, split_mode):
+    return SPLIT_MODES[split_mode](audio_file, clips)
+
+# Function to split several sources, optionally fanning sources and clip ranges out to a
+# process pool. Clips recorded as up to date in a source's split manifest are skipped.
+# With silence_options, clip boundaries are snapped to silence (see get_cut_points).
+# Returns ({audio_file: clips created}, {audio_file: [error messages]}).
+def process_sources(jobs, clip_duration, title_prefix, output_folder, split_mode, max_workers=1,
+                    silence_options=None):
+    results = {}
+    errors = {}
+    planned = []
+    for audio_file, titles_file in jobs:
+        print(f"Processing {audio_file} with titles from {titles_file}...")
+        results[audio_file] = 0
+        try:
+            cut_points = None
+            if silence_options is not None:
+                cut_points = get_cut_points(audio_file, clip_duration, output_folder, silence_options)
+            clips = plan_clips(audio_file, titles_file, clip_duration, title_prefix, output_folder, cut_points)
+            pending, state = filter_current_clips(audio_file, titles_file, clips, clip_duration, title_prefix, output_folder)
+        except (OSError, ValueError, ImportError) as e:
+            print(e)
+            errors.setdefault(audio_file, []).append(str(e))
+            continue
+        if len(pending) < len(clips):
+            print(f"Skipping {len(clips) - len(pending)} up-to-date clips for {audio_file}.")
+        planned.append((audio_file, pending, state))
+    audio_probe.save_cache()
+
+    if max_workers <= 1:
+        for audio_file, clips, state in planned:
+            if not clips:
+                record_clips(state, [])
+            try:
+                for i in range(0, len(clips), MANIFEST_BATCH_CLIPS):
+                    created = SPLIT_MODES[split_mode](audio_file, clips[i:i + MANIFEST_BATCH_CLIPS])
+                    record_clips(state, created)
+                    results[audio_file] += len(created)
+            except ClipErrors as e:
+                # Keep the clips that were cut so a rerun only retries the failed ones
+                record_clips(state, e.created)
+                results[audio_file] += len(e.created)
+                print(f"Error splitting {audio_file}: {e}")
+                errors.setdefault(audio_file, []).append(str(e))
+            except (OSError, ValueError) as e:
+                print(f"Error splitting {audio_file}: {e}")
+                errors.setdefault(audio_file, []).append(str(e))
+        return results, errors
+
+    # Split each source into clip ranges so one long source can use several workers
+    total_clips = sum(len(clips) for _, clips, _ in planned)
+    chunk_size = max(MIN_CHUNK_CLIPS, math.ceil(total_clips / (max_workers * 4)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for audio_file, clips, state in planned:
+            if not clips:
+                record_clips(state, [])
+            for i in range(0, len(clips), chunk_size):
+                future = executor.submit(cut_clip_chunk, audio_file, clips[i:i + chunk_size], split_mode)
+                futures[future] = (audio_file, state)
+        for future in as_completed(futures):
+            audio_file, state = futures[future]
+            try:
+                created = future.result()
+                record_clips(state, created)
+                results[audio_file] += len(created)
+            except ClipErrors as e:
+                record_clips(state, e.created)
+                results[audio_file] += len(e.created)
+                print(f"Error splitting {audio_file}: {e}")
+                errors.setdefault(audio_file, []).append(str(e))
+            except Exception as e:
+                print(f"Error splitting {audio_file}: {e}")
+                errors.setdefault(audio_file, []).append(str(e))
+    return results, errors
+
+# Function to verify no "REMOVE" clips exist in the output folders. The planner never
+# cuts REMOVE placeholders, so this only deletes leftovers from older runs.
 def cleanup_remove_files(file_mappings, output_folder):
+    leftovers = 0
     for audio_file in file_mappings.keys():
         base_name = os.path.splitext(os.path.basename(audio_file))[0]
         output_dir = os.path.join(output_folder, base_name)
         if os.path.isdir(output_dir):
             for filename in os.listdir(output_dir):
-                if "REMOVE" in filename.upper():
+                if is_remove_title(filename):
+                    leftovers += 1
                     file_path = os.path.join(output_dir, filename)
                     try:
                         os.remove(file_path)
-                        print(f"Deleted file: {file_path}")
+                        print(f"Deleted leftover file: {file_path}")
                     except OSError as e:
                         print(f"Error deleting file {file_path}: {e}")
+    if not leftovers:
+        print("Verified: no REMOVE clips in the output folders.")
 
 # Function to start processing with GUI inputs
 def start_processing():
     try:
         clip_duration = float(duration_entry.get())
-        title_prefix = prefix_entry.get()
-        selected_folder = folder_entry.get()
-        sanitized_folder = os.path.normpath(selected_folder)
-        audio_file_mappings, title_file_mappings = get_file_mappings(sanitized_folder)
-        output_folder = sanitized_folder
-
-        for audio_file, titles_file in audio_file_mappings.items():
-            titles_file_path = title_file_mappings.get(audio_file)
-            if not os.path.isfile(audio_file):
-                print(f"Missing audio file: {audio_file}")
-                continue
-            if not os.path.isfile(titles_file_path):
-                print(f"Missing title file: {titles_file_path}")
-                continue
-            print(f"Processing {audio_file} with titles from {titles_file_path}...")
-            split_audio_file(audio_file, titles_file_path, clip_duration, title_prefix, output_folder)
+    except ValueError:
+        messagebox.showerror("Invalid Input", "Please enter a valid number for clip duration.")
+        return
+    max_workers = 1
+    if parallel_var.get():
+        try:
+            max_workers = max(1, int(workers_entry.get()))
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter a whole number of workers.")
+            return
+    title_prefix = prefix_entry.get()
+    split_mode = mode_var.get()
+    selected_folder = folder_entry.get()
+    sanitized_folder = os.path.normpath(selected_folder)
+    audio_file_mappings, title_file_mappings = get_file_mappings(sanitized_folder)
+    output_folder = sanitized_folder
 
-        cleanup_remove_files(audio_file_mappings, output_folder)
+    jobs = []
+    for audio_name, audio_file in audio_file_mappings.items():
+        titles_file_path = title_file_mappings.get(audio_name)
+        if not os.path.isfile(audio_file):
+            print(f"Missing audio file: {audio_file}")
+            continue
+        if not os.path.isfile(titles_file_path):
+            print(f"Missing title file: {titles_file_path}")
+            continue
+        jobs.append((audio_file, titles_file_path))
 
+    silence_options = None
+    if silence_var.get():
+        try:
+            silence_options = dict(DEFAULT_SILENCE_OPTIONS, silence_db=float(silence_entry.get()))
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter a valid number for the silence threshold.")
+            return
+
+    results, errors = process_sources(jobs, clip_duration, title_prefix, output_folder, split_mode, max_workers,
+                                      silence_options)
+    cleanup_remove_files(audio_file_mappings, output_folder)
+
+    summary = "\n".join(f"{os.path.basename(audio_file)}: {count} clips" for audio_file, count in results.items())
+    if errors:
+        details = "\n".join(f"{os.path.basename(audio_file)}: {messages[0]}" for audio_file, messages in errors.items())
+        print(f"Finished with errors in {len(errors)} of {len(results)} files.")
+        messagebox.showwarning("Finished With Errors", f"{summary}\n\nErrors:\n{details}")
+    else:
         print("All audio files have been processed successfully.")
-        messagebox.showinfo("Success", "All audio files have been processed successfully.")
-    except ValueError:
-        messagebox.showerror("Invalid Input", "Please enter a valid number for clip duration.")
+        messagebox.showinfo("Success", f"All audio files have been processed successfully.\n\n{summary}")
 
 # Function to browse for a folder
 def browse_folder():
@@ -139,36 +564,71 @@ def browse_folder():
         folder_entry.delete(0, tk.END)
         folder_entry.insert(0, folder_selected)
 
-# Create the main window
-root = tk.Tk()
-root.title("Batch Audio Splitter")
-
-# Folder selection
-folder_frame = tk.LabelFrame(root, text="Target Folder")
-folder_frame.pack(pady=10, padx=10, fill="x")
-folder_entry = tk.Entry(folder_frame, width=50)
-folder_entry.insert(0, default_folder)
-folder_entry.pack(side="left", padx=5, pady=5)
-browse_button = tk.Button(folder_frame, text="Browse", command=browse_folder)
-browse_button.pack(side="left", padx=5)
-
-# Clip duration entry
-duration_label = tk.Label(root, text="Clip Duration (seconds):")
-duration_label.pack(pady=5)
-duration_entry = tk.Entry(root)
-duration_entry.insert(0, "2")
-duration_entry.pack(pady=5)
-
-# Title prefix entry
-prefix_label = tk.Label(root, text="Title Prefix:")
-prefix_label.pack(pady=5)
-prefix_entry = tk.Entry(root)
-prefix_entry.insert(0, "1.1.1.1")
-prefix_entry.pack(pady=5)
-
-# Start button
-start_button = tk.Button(root, text="Start Processing", command=start_processing)
-start_button.pack(pady=20)
-
-# Run the application
-root.mainloop()
+# The GUI only runs in the main process so pool workers can import this module safely
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+    # Create the main window
+    root = tk.Tk()
+    root.title("Batch Audio Splitter")
+
+    # Folder selection
+    folder_frame = tk.LabelFrame(root, text="Target Folder")
+    folder_frame.pack(pady=10, padx=10, fill="x")
+    folder_entry = tk.Entry(folder_frame, width=50)
+    folder_entry.insert(0, default_folder)
+    folder_entry.pack(side="left", padx=5, pady=5)
+    browse_button = tk.Button(folder_frame, text="Browse", command=browse_folder)
+    browse_button.pack(side="left", padx=5)
+
+    # Clip duration entry
+    duration_label = tk.Label(root, text="Clip Duration (seconds):")
+    duration_label.pack(pady=5)
+    duration_entry = tk.Entry(root)
+    duration_entry.insert(0, "2")
+    duration_entry.pack(pady=5)
+
+    # Title prefix entry
+    prefix_label = tk.Label(root, text="Title Prefix:")
+    prefix_label.pack(pady=5)
+    prefix_entry = tk.Entry(root)
+    prefix_entry.insert(0, "1.1.1.1")
+    prefix_entry.pack(pady=5)
+
+    # Split mode selection
+    mode_label = tk.Label(root, text="Split Mode:")
+    mode_label.pack(pady=5)
+    mode_var = tk.StringVar(value="Native WAV")
+    mode_combo = ttk.Combobox(root, textvariable=mode_var, values=list(SPLIT_MODES), state="readonly")
+    mode_combo.pack(pady=5)
+
+    # Silence-aware cut options
+    silence_frame = tk.Frame(root)
+    silence_frame.pack(pady=5)
+    silence_var = tk.BooleanVar(value=False)
+    silence_check = tk.Checkbutton(silence_frame, text="Snap cuts to silence", variable=silence_var)
+    silence_check.pack(side="left", padx=5)
+    silence_label = tk.Label(silence_frame, text="Threshold (dB):")
+    silence_label.pack(side="left")
+    silence_entry = tk.Entry(silence_frame, width=6)
+    silence_entry.insert(0, str(DEFAULT_SILENCE_OPTIONS['silence_db']))
+    silence_entry.pack(side="left", padx=5)
+
+    # Parallel processing options
+    parallel_frame = tk.Frame(root)
+    parallel_frame.pack(pady=5)
+    parallel_var = tk.BooleanVar(value=False)
+    parallel_check = tk.Checkbutton(parallel_frame, text="Parallel", variable=parallel_var)
+    parallel_check.pack(side="left", padx=5)
+    workers_label = tk.Label(parallel_frame, text="Workers:")
+    workers_label.pack(side="left")
+    workers_entry = tk.Entry(parallel_frame, width=5)
+    workers_entry.insert(0, str(os.cpu_count() or 1))
+    workers_entry.pack(side="left", padx=5)
+
+    # Start button
+    start_button = tk.Button(root, text="Start Processing", command=start_processing)
+    start_button.pack(pady=20)
+
+    # Run the application
+    root.mainloop()
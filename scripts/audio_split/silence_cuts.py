@@ -0,0 +1,124 @@
+"""
+silence_cuts.py
+
+Silence-aware cut point detection for the batch splitter. Streams the source in
+fixed-size blocks, measures short-frame energy with NumPy and moves each clip
+boundary to the silence gap nearest its expected position. Memory use is bounded
+by the block size and search window, not by the length of the file.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import ffmpeg_jobs, pcm, wav_io
+
+# Sample rate used when an unsupported source is decoded through ffmpeg for analysis
+ANALYSIS_SAMPLE_RATE = 16000
+
+
+# Function to stream a source as float32 blocks. Yields (sample_rate, block) pairs;
+# uncompressed WAVs are read directly, anything else is decoded to mono by ffmpeg.
+def iter_pcm_blocks(audio_file, block_seconds=10.0):
+    try:
+        info = wav_io.read_wav_info(audio_file)
+    except ValueError:
+        info = None
+
+    if info is not None and info.is_uncompressed:
+        for block in pcm.iter_wav_blocks(audio_file, info, int(block_seconds * info.sample_rate)):
+            yield info.sample_rate, block
+        return
+
+    arguments = ['-v', 'error', '-i', audio_file, '-f', 'f32le', '-ac', '1', '-ar', str(ANALYSIS_SAMPLE_RATE), '-']
+    block_bytes = int(block_seconds * ANALYSIS_SAMPLE_RATE) * 4
+    with ffmpeg_jobs.StreamJob(arguments, pipe_stdout=True) as job:
+        pending = b''
+        while True:
+            raw = job.stdout.read(block_bytes)
+            if not raw:
+                break
+            raw = pending + raw
+            usable = len(raw) - len(raw) % 4
+            pending = raw[usable:]
+            yield ANALYSIS_SAMPLE_RATE, np.frombuffer(raw[:usable], dtype='<f4').reshape(-1, 1)
+        try:
+            job.finish()
+        except ffmpeg_jobs.FFmpegError as e:
+            raise ffmpeg_jobs.FFmpegError(f"ffmpeg could not decode {audio_file} for silence analysis: {e}",
+                                          e.command, e.returncode, e.stderr) from e
+
+
+# Function to pick the cut inside a search window: the middle of the silent run
+# closest to the expected boundary, or the expected boundary when nothing is silent
+def choose_cut(window_db, first_frame, frame_seconds, expected, silence_db, min_silence_frames):
+    silent = np.concatenate(([0], (window_db < silence_db).astype(np.int8), [0]))
+    edges = np.diff(silent)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    long_enough = (ends - starts) >= min_silence_frames
+    if not long_enough.any():
+        return expected
+    middles = (first_frame + (starts[long_enough] + ends[long_enough]) / 2.0) * frame_seconds
+    return float(middles[np.argmin(np.abs(middles - expected))])
+
+
+# Function to find clip boundaries near every clip_duration, snapped to silence.
+# Each boundary is searched for around the previous cut plus clip_duration, so timing
+# drift in generated audio does not accumulate into later clips. Returns the cut
+# times in seconds (one fewer than the number of clips).
+def find_cut_points(audio_file, clip_duration, silence_db=-40.0, max_shift=0.5,
+                    min_silence=0.05, frame_seconds=0.01, block_seconds=10.0):
+    window = min(max_shift, clip_duration / 4.0)
+    min_silence_frames = max(1, int(round(min_silence / frame_seconds)))
+    cuts = []
+    expected = clip_duration
+    energies = np.empty(0, dtype=np.float64)  # Frame energies in dB, starting at frame buffer_start
+    buffer_start = 0
+
+    # Resolve every boundary whose search window is covered by the buffered frames
+    # (or, at the end of the stream, every boundary before the end of the file)
+    def resolve_boundaries(end_of_stream, total_duration=None):
+        nonlocal expected, energies, buffer_start
+        while True:
+            available = buffer_start + len(energies)
+            last = int(np.ceil((expected + window) / frame_seconds))
+            if end_of_stream:
+                if expected >= total_duration:
+                    return
+                last = min(last, available)
+            elif last > available:
+                return
+            first = min(max(buffer_start, int(np.floor((expected - window) / frame_seconds))), last)
+            window_db = energies[first - buffer_start:last - buffer_start]
+            cut = choose_cut(window_db, first, frame_seconds, expected, silence_db, min_silence_frames)
+            if end_of_stream and cut >= total_duration:
+                return
+            cuts.append(cut)
+            expected = cut + clip_duration
+            # Frames before the next search window are never needed again
+            keep_from = min(max(buffer_start, int(np.floor((expected - window) / frame_seconds))), available)
+            energies = energies[keep_from - buffer_start:]
+            buffer_start = keep_from
+
+    sample_rate = None
+    frame_length = None
+    leftover = np.empty(0, dtype=np.float32)
+    total_samples = 0
+    for sample_rate, block in iter_pcm_blocks(audio_file, block_seconds):
+        if frame_length is None:
+            frame_length = max(1, int(round(frame_seconds * sample_rate)))
+            frame_seconds = frame_length / sample_rate
+        total_samples += len(block)
+        power = np.concatenate((leftover, np.mean(np.square(block), axis=1)))
+        frames = len(power) // frame_length
+        leftover = power[frames * frame_length:]
+        frame_power = power[:frames * frame_length].reshape(frames, frame_length).mean(axis=1)
+        energies = np.concatenate((energies, 10.0 * np.log10(frame_power + 1e-12)))
+        resolve_boundaries(False)
+
+    if sample_rate is not None:
+        resolve_boundaries(True, total_samples / sample_rate)
+    return cuts
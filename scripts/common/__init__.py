@@ -0,0 +1,6 @@
+"""
+Shared helpers used by the scripts in this repository.
+
+Scripts add the parent ``scripts`` folder to ``sys.path`` and import from
+``common`` so they keep working when run directly from their own folder.
+"""
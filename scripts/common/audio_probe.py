@@ -0,0 +1,291 @@
+"""
+audio_probe.py
+
+In-process audio header probe shared by the audio scripts. Reads duration,
+sample rate, channel count and bit depth straight from WAV, FLAC and MP3
+headers, falling back to ffprobe for anything else. Results are cached on disk
+keyed by path, size and modification time, so repeated runs over the same
+session folder skip probing entirely. The cache is safe to share between
+worker threads.
+"""
+
+import atexit
+import json
+import os
+import struct
+import threading
+
+from common import ffmpeg_jobs, wav_io
+
+CACHE_VERSION = 2  # 2: compressed WAVs are measured by ffprobe
+
+# Seconds an ffprobe run may take before it is killed
+FFPROBE_TIMEOUT = 60.0
+
+# MP3 header lookup tables, indexed by [version][layer] / [version]
+MP3_BITRATES = {
+    # MPEG-1, layers I/II/III
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    # MPEG-2 / 2.5, layer I and layers II/III
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+# Function to build the probe result dictionary shared by every format reader
+def _result(codec, duration, sample_rate, channels, bits_per_sample):
+    return {
+        'codec': codec,
+        'duration': duration,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'bits_per_sample': bits_per_sample,
+    }
+
+
+# Function to return the offset just past an ID3v2 tag (0 when there is none)
+def _skip_id3v2(f):
+    f.seek(0)
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b'ID3':
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        footer = 10 if header[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+# Function to probe a PCM/float WAV file from its RIFF header. Compressed WAVs (ADPCM and
+# the like) are left to ffprobe: their block_align does not give the frame count.
+def _probe_wav(f):
+    info = wav_io.read_wav_info(f)
+    if not info.is_uncompressed:
+        raise ValueError(f"Compressed WAV (format 0x{info.sample_format:04x})")
+    return _result('pcm', info.duration, info.sample_rate, info.channels, info.bits_per_sample)
+
+
+# Function to probe a FLAC file from its STREAMINFO block
+def _probe_flac(f):
+    f.seek(_skip_id3v2(f))
+    if f.read(4) != b'fLaC':
+        raise ValueError("Not a FLAC file")
+    block_header = f.read(4)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        raise ValueError("FLAC STREAMINFO block missing")
+    streaminfo = f.read(34)
+    if len(streaminfo) < 34:
+        raise ValueError("Truncated FLAC STREAMINFO block")
+    packed = int.from_bytes(streaminfo[10:18], 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits_per_sample = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if sample_rate == 0:
+        raise ValueError("Invalid FLAC sample rate")
+    return _result('flac', total_samples / sample_rate, sample_rate, channels, bits_per_sample)
+
+
+# Function to parse an MP3 frame header, returning None when the bytes are not a frame
+def _parse_mp3_header(header):
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = {0: 2.5, 2: 2, 3: 1}.get((header[1] >> 3) & 0x3)
+    layer = {1: 3, 2: 2, 3: 1}.get((header[1] >> 1) & 0x3)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x3
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    channels = 1 if header[3] >> 6 == 3 else 2
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 3 and version != 1:
+        samples_per_frame = 576
+    else:
+        samples_per_frame = 1152
+    return version, layer, bitrate, sample_rate, channels, samples_per_frame
+
+
+# Function to probe an MP3 file from its first frame and any Xing/Info/VBRI header
+def _probe_mp3(f):
+    f.seek(0, 2)
+    file_size = f.tell()
+    audio_start = _skip_id3v2(f)
+    f.seek(audio_start)
+    # Scan a bounded window for the first frame sync (some encoders pad after ID3)
+    window = f.read(64 * 1024)
+    for offset in range(len(window) - 3):
+        parsed = _parse_mp3_header(window[offset:offset + 4])
+        if parsed:
+            break
+    else:
+        raise ValueError("No MP3 frame header found")
+    version, layer, bitrate, sample_rate, channels, samples_per_frame = parsed
+    frame = window[offset:offset + 200]
+
+    # Xing/Info sits after the side information; VBRI sits at a fixed offset of 32
+    if version == 1:
+        xing_offset = 4 + (17 if channels == 1 else 32)
+    else:
+        xing_offset = 4 + (9 if channels == 1 else 17)
+    frame_count = None
+    if frame[xing_offset:xing_offset + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack_from('>I', frame, xing_offset + 4)[0]
+        if flags & 0x1:
+            frame_count = struct.unpack_from('>I', frame, xing_offset + 8)[0]
+    elif frame[36:40] == b'VBRI':
+        frame_count = struct.unpack_from('>I', frame, 36 + 14)[0]
+
+    if frame_count:
+        duration = frame_count * samples_per_frame / sample_rate
+    else:
+        # Constant bitrate: derive the duration from the audio payload size
+        audio_size = file_size - audio_start - offset
+        f.seek(max(file_size - 128, 0))
+        if f.read(3) == b'TAG':
+            audio_size -= 128
+        duration = audio_size * 8 / bitrate
+    return _result(f'mp3_layer{layer}', duration, sample_rate, channels, None)
+
+
+# Function to probe any other format with ffprobe
+def _probe_ffprobe(path):
+    result = ffmpeg_jobs.run_job(
+        ['-v', 'error', '-select_streams', 'a:0',
+         '-show_entries', 'stream=codec_name,sample_rate,channels,bits_per_raw_sample:format=duration',
+         '-of', 'json', path],
+        binary='ffprobe', timeout=FFPROBE_TIMEOUT, retries=0, capture_stdout=True
+    )
+    data = json.loads(result.stdout)
+    streams = data.get('streams') or [{}]
+    stream = streams[0]
+    bits = stream.get('bits_per_raw_sample')
+    return _result(
+        stream.get('codec_name'),
+        float(data['format']['duration']),
+        int(stream['sample_rate']) if stream.get('sample_rate') else None,
+        stream.get('channels'),
+        int(bits) if bits else None,
+    )
+
+
+# Header readers by leading magic bytes
+HEADER_PROBES = [
+    (b'RIFF', _probe_wav),
+    (b'fLaC', _probe_flac),
+]
+
+
+# Function to probe a file without the cache
+def probe_audio_uncached(path):
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+        try:
+            for prefix, reader in HEADER_PROBES:
+                if magic == prefix:
+                    return reader(f)
+            extension = os.path.splitext(path)[1].lower()
+            if extension == '.flac':
+                return _probe_flac(f)
+            if extension == '.mp3' or magic[:3] == b'ID3' or _parse_mp3_header(magic):
+                return _probe_mp3(f)
+        except (ValueError, struct.error) as e:
+            header_error = e
+        else:
+            header_error = None
+    try:
+        return _probe_ffprobe(path)
+    except (OSError, ValueError, KeyError) as e:
+        raise ValueError(f"Could not probe {path}: {header_error or e}") from e
+
+
+class ProbeCache:
+    """JSON-backed probe results keyed by absolute path, size and mtime."""
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.entries = None
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, path, stat_result):
+        with self.lock:
+            self._load()
+            entry = self.entries.get(path)
+        if entry and entry['size'] == stat_result.st_size and entry['mtime_ns'] == stat_result.st_mtime_ns:
+            return entry['info']
+        return None
+
+    def put(self, path, stat_result, info):
+        with self.lock:
+            self._load()
+            self.entries[path] = {'size': stat_result.st_size, 'mtime_ns': stat_result.st_mtime_ns, 'info': info}
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self.entries}, f)
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
+
+
+# Function to locate the per-user cache directory (overridable for tests and CI)
+def cache_dir():
+    override = os.environ.get('AUDIO_TOOLS_CACHE_DIR')
+    if override:
+        return override
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ai-audio-tools')
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+# Function to return the shared on-disk probe cache, saved automatically at exit
+def default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProbeCache(os.path.join(cache_dir(), 'probe_cache.json'))
+            atexit.register(_default_cache.save)
+    return _default_cache
+
+
+# Function to probe a file, reusing cached results while its size and mtime are unchanged
+def probe_audio(path, cache=None):
+    cache = cache or default_cache()
+    path = os.path.abspath(path)
+    stat_result = os.stat(path)
+    info = cache.get(path, stat_result)
+    if info is None:
+        info = probe_audio_uncached(path)
+        cache.put(path, stat_result, info)
+    return info
+
+
+# Function to write pending probe results to disk
+def save_cache():
+    if _default_cache is not None:
+        _default_cache.save()
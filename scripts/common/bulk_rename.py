@@ -0,0 +1,290 @@
+"""
+bulk_rename.py
+
+Planned, journaled bulk renames. A batch of requested renames is first turned
+into a complete plan: renames that would overwrite an existing file or give two
+files the same name are skipped, chains (A -> B, B -> C) are ordered so every
+target is free when its rename runs, and cycles (A -> B, B -> A) are broken
+with a temporary name. The plan is then applied with an append-only journal
+(one JSON object per line), so an interrupted batch can be resumed and any
+batch can be undone.
+
+Journal records:
+    {"op": "plan", "batch": id, "steps": [[src, dst], ...], "undoes": id or null}
+    {"op": "done", "batch": id, "step": index}
+    {"op": "commit", "batch": id}
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+
+# One requested rename the plan could not include, and why
+SkippedRename = namedtuple('SkippedRename', ['src', 'dst', 'reason'])
+
+
+class RenamePlan:
+    """Ordered rename steps for a batch, including any temporary-name steps.
+
+    ``renames`` lists the requested (src, dst) pairs that will happen, ``skipped``
+    the ones that will not, and ``steps`` the actual os.rename calls in order.
+    ``batch_id`` names the batch in the journal (and its temporary files).
+    """
+
+    def __init__(self, renames, steps, skipped, batch_id=None):
+        self.renames = renames
+        self.steps = steps
+        self.skipped = skipped
+        self.batch_id = batch_id or new_batch_id()
+
+
+# Function to make a batch id that sorts by creation time
+def new_batch_id():
+    now_ns = time.time_ns()
+    seconds = time.strftime('%Y%m%dT%H%M%S', time.localtime(now_ns // 1000000000))
+    return f"{seconds}.{now_ns % 1000000000:09d}-{os.getpid()}"
+
+
+# Function to pick an unused temporary name next to a file
+def _temp_name(path, batch_id, taken):
+    directory = os.path.dirname(path)
+    number = 0
+    while True:
+        candidate = os.path.join(directory, f".rename-{batch_id}-{number}.tmp")
+        if candidate not in taken and not os.path.lexists(candidate):
+            taken.add(candidate)
+            return candidate
+        number += 1
+
+
+# Function to check whether two paths name the same existing file (a case-only rename
+# on a case-insensitive filesystem)
+def _same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+# Function to build the plan for a list of (src, dst) paths
+def plan_renames(pairs, batch_id=None):
+    batch_id = batch_id or new_batch_id()
+    moves = {}
+    skipped = []
+    for src, dst in pairs:
+        src, dst = os.path.abspath(src), os.path.abspath(dst)
+        if src == dst:
+            continue
+        if src in moves:
+            skipped.append(SkippedRename(src, dst, "file is already renamed by an earlier row"))
+            continue
+        moves[src] = dst
+
+    # Two files renamed to the same name: neither can go ahead
+    targets = {}
+    for src, dst in moves.items():
+        targets.setdefault(dst, []).append(src)
+    blocked = {}
+    for dst, sources in targets.items():
+        if len(sources) > 1:
+            for src in sources:
+                blocked[src] = "another file is renamed to the same name"
+
+    # Targets already on disk are only usable when that file is itself moving away
+    in_place = set()
+    for src, dst in moves.items():
+        if src in blocked or dst in moves or not os.path.lexists(dst):
+            continue
+        if _same_file(src, dst):
+            in_place.add(src)  # Case-only rename: goes through a temporary name
+        else:
+            blocked[src] = "target name already exists"
+
+    # A rename into a name whose own rename is blocked cannot happen either
+    changed = True
+    while changed:
+        changed = False
+        for src, dst in moves.items():
+            if src not in blocked and dst in blocked:
+                blocked[src] = f"target is not freed ({os.path.basename(dst)} is not renamed)"
+                changed = True
+    for src, reason in blocked.items():
+        skipped.append(SkippedRename(src, moves[src], reason))
+    moves = {src: dst for src, dst in moves.items() if src not in blocked}
+
+    # Each target has at most one source, so moves form simple chains and cycles.
+    # A rename runs only after the rename out of its target.
+    predecessor = {dst: src for src, dst in moves.items()}
+    steps = []
+    done = set()
+    taken = set()
+    for src in sorted(moves):
+        if moves[src] in moves or src in done:
+            continue  # Not the end of a chain
+        node = src
+        while node is not None and node not in done:
+            if node in in_place:
+                temp = _temp_name(node, batch_id, taken)
+                steps.extend([(node, temp), (temp, moves[node])])
+            else:
+                steps.append((node, moves[node]))
+            done.add(node)
+            node = predecessor.get(node)
+    for start in sorted(moves):
+        if start in done:
+            continue
+        # A cycle: park the first file under a temporary name, rotate the rest, then
+        # move the parked file into place
+        temp = _temp_name(start, batch_id, taken)
+        steps.append((start, temp))
+        done.add(start)
+        node = predecessor[start]
+        while node != start:
+            steps.append((node, moves[node]))
+            done.add(node)
+            node = predecessor[node]
+        steps.append((temp, moves[start]))
+
+    renames = sorted(moves.items())
+    return RenamePlan(renames, steps, sorted(skipped), batch_id)
+
+
+# Function to read the journal into {batch id: {"steps", "done", "committed", "undoes"}},
+# in the order batches were started. A torn last line (crash mid-write) is ignored.
+def read_journal(journal_path):
+    batches = {}
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                batch = record.get('batch')
+                if record.get('op') == 'plan':
+                    batches[batch] = {'steps': [tuple(step) for step in record['steps']], 'done': set(),
+                                      'committed': False, 'undoes': record.get('undoes')}
+                elif batch in batches and record.get('op') == 'done':
+                    batches[batch]['done'].add(record['step'])
+                elif batch in batches and record.get('op') == 'commit':
+                    batches[batch]['committed'] = True
+    except FileNotFoundError:
+        pass
+    return batches
+
+
+class RenameJournal:
+    """Append-only journal file; every record is flushed before the next rename."""
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.file = None
+
+    def __enter__(self):
+        # Start on a fresh line if a crash left a torn record at the end
+        torn = False
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(0, 2)
+                if f.tell():
+                    f.seek(-1, 2)
+                    torn = f.read(1) != b"\n"
+        except FileNotFoundError:
+            pass
+        self.file = open(self.journal_path, 'a', encoding='utf-8')
+        if torn:
+            self.file.write("\n")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+
+# Function to run the steps of a batch that are not done yet. A step whose source is
+# gone but whose target exists already happened (the crash came before its record).
+# Raises OSError, leaving the batch open for resume, when a step cannot be made.
+def _run_steps(journal, batch_id, steps, done, progress=None):
+    for index, (src, dst) in enumerate(steps):
+        if index in done:
+            continue
+        src_exists, dst_exists = os.path.lexists(src), os.path.lexists(dst)
+        if src_exists and not dst_exists:
+            os.rename(src, dst)
+        elif src_exists or not dst_exists:
+            raise OSError(f"Cannot rename {src} -> {dst}: "
+                          + ("the target now exists" if dst_exists else "the source is gone"))
+        journal.write({'op': 'done', 'batch': batch_id, 'step': index})
+        done.add(index)
+        if progress:
+            progress(len(done), len(steps))
+    journal.write({'op': 'commit', 'batch': batch_id})
+
+
+# Function to apply a plan as a new journaled batch. Returns the batch id.
+def apply_plan(plan, journal_path, progress=None, undoes=None):
+    batch_id = plan.batch_id
+    with RenameJournal(journal_path) as journal:
+        journal.write({'op': 'plan', 'batch': batch_id, 'steps': plan.steps, 'undoes': undoes})
+        _run_steps(journal, batch_id, plan.steps, set(), progress)
+    return batch_id
+
+
+# Function to find the batch left open by an interrupted run, as (batch id, batch) or None
+def pending_batch(journal_path):
+    batches = read_journal(journal_path)
+    if not batches:
+        return None
+    batch_id, batch = list(batches.items())[-1]
+    return None if batch['committed'] else (batch_id, batch)
+
+
+# Function to finish an interrupted batch. Returns the number of steps run, or 0 when
+# nothing was pending.
+def resume(journal_path, progress=None):
+    pending = pending_batch(journal_path)
+    if pending is None:
+        return 0
+    batch_id, batch = pending
+    remaining = len(batch['steps']) - len(batch['done'])
+    with RenameJournal(journal_path) as journal:
+        _run_steps(journal, batch_id, batch['steps'], batch['done'], progress)
+    return remaining
+
+
+# Function to find the latest batch that can be undone: not an undo itself and not
+# already undone. Returns (batch id, batch) or None.
+def undoable_batch(journal_path):
+    batches = read_journal(journal_path)
+    undone = {batch['undoes'] for batch in batches.values() if batch['undoes']}
+    for batch_id, batch in reversed(list(batches.items())):
+        if not batch['undoes'] and batch_id not in undone:
+            return batch_id, batch
+    return None
+
+
+# Function to undo the latest batch (including a partly applied one) by replaying its
+# completed steps backwards as a new batch. Returns (undone batch id, steps reverted),
+# or None when there is nothing to undo.
+def undo_last(journal_path, progress=None):
+    pending = pending_batch(journal_path)
+    if pending is not None and pending[1]['undoes']:
+        raise OSError("An interrupted undo is pending; resume it first")
+    target = undoable_batch(journal_path)
+    if target is None:
+        return None
+    batch_id, batch = target
+    steps = [(dst, src) for index, (src, dst) in reversed(list(enumerate(batch['steps'])))
+             if index in batch['done']]
+    if not batch['committed']:
+        # Close the interrupted batch so it is not offered for resume after the undo
+        with RenameJournal(journal_path) as journal:
+            journal.write({'op': 'commit', 'batch': batch_id})
+    apply_plan(RenamePlan([], steps, []), journal_path, progress, undoes=batch_id)
+    return batch_id, len(steps)
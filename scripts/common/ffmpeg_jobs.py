@@ -0,0 +1,200 @@
+"""
+ffmpeg_jobs.py
+
+Shared execution layer for the ffmpeg/ffprobe runs made by the audio scripts.
+Finds the binaries once (FFMPEG_BINARY / FFPROBE_BINARY, then PATH, then the
+usual Homebrew and /usr/local locations), and runs jobs with a timeout, retries,
+captured stderr and exit-status checks, singly or on a bounded thread pool
+(ffmpeg does the work in its own process, so threads are enough). StreamJob
+gives the same lookup, timeout and exit checks to jobs whose input or output is
+piped block by block. Pointing FFMPEG_BINARY at a local script lets tests stand
+in for ffmpeg.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Environment variables that override binary discovery
+BINARY_ENVIRONMENT = {'ffmpeg': 'FFMPEG_BINARY', 'ffprobe': 'FFPROBE_BINARY'}
+
+# Places checked after PATH (GUI apps on macOS often start without Homebrew on PATH)
+FALLBACK_DIRS = ('/opt/homebrew/bin', '/usr/local/bin', '/usr/bin')
+
+DEFAULT_TIMEOUT = 600.0   # Seconds before a job is killed
+DEFAULT_RETRIES = 1       # Extra attempts after a failed run
+RETRY_DELAY = 0.5         # Seconds before the first retry, doubled for each later one
+STDERR_LIMIT = 4000       # Characters of stderr kept for error messages
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Outcome of a successful job: the command run, its stdout (bytes, when captured) and
+# stderr (text), how many attempts it took and the wall time of the last attempt
+JobResult = namedtuple('JobResult', ['command', 'stdout', 'stderr', 'attempts', 'seconds'])
+
+
+class FFmpegError(ValueError):
+    """An ffmpeg/ffprobe job failed on every attempt (non-zero exit or timeout)."""
+
+    def __init__(self, message, command=None, returncode=None, stderr=""):
+        super().__init__(message)
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+# Function to find a binary: its environment override, then PATH, then FALLBACK_DIRS.
+# Returns None when it cannot be found.
+def find_binary(name='ffmpeg'):
+    override = os.environ.get(BINARY_ENVIRONMENT.get(name, ''))
+    if override:
+        return shutil.which(override) or (override if os.path.isfile(override) else None)
+    found = shutil.which(name)
+    if found:
+        return found
+    for directory in FALLBACK_DIRS:
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+# Function to get a binary's path, raising FileNotFoundError with a hint when it is missing
+def binary_path(name='ffmpeg'):
+    path = find_binary(name)
+    if path is None:
+        variable = BINARY_ENVIRONMENT.get(name)
+        hint = f" (install it, add it to PATH or set {variable})" if variable else ""
+        raise FileNotFoundError(f"{name} not found{hint}")
+    return path
+
+
+# Function to keep the end of a job's stderr, where ffmpeg reports the error
+def _stderr_tail(stderr):
+    text = stderr.decode('utf-8', 'replace').strip() if stderr else ""
+    return text if len(text) <= STDERR_LIMIT else "..." + text[-STDERR_LIMIT:]
+
+
+# Function to run one job (arguments after the binary name). Raises FFmpegError when every
+# attempt fails and FileNotFoundError when the binary is missing; returns a JobResult.
+def run_job(arguments, binary='ffmpeg', timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+            capture_stdout=False):
+    command = [binary_path(binary)] + [str(argument) for argument in arguments]
+    stdout = subprocess.PIPE if capture_stdout else subprocess.DEVNULL
+    delay = RETRY_DELAY
+    for attempt in range(1, retries + 2):
+        started = time.monotonic()
+        try:
+            completed = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=stdout,
+                                       stderr=subprocess.PIPE, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            stderr = _stderr_tail(e.stderr)
+            error = FFmpegError(f"{binary} timed out after {timeout:g}s" + (f": {stderr}" if stderr else ""),
+                                command, None, stderr)
+        else:
+            stderr = _stderr_tail(completed.stderr)
+            if completed.returncode == 0:
+                return JobResult(command, completed.stdout, stderr, attempt, time.monotonic() - started)
+            error = FFmpegError(stderr or f"{binary} exited with status {completed.returncode}",
+                                command, completed.returncode, stderr)
+        if attempt <= retries:
+            time.sleep(delay)
+            delay *= 2
+    raise error
+
+
+# Function to run many jobs on a bounded thread pool. jobs is a list of argument lists;
+# keyword options are passed to run_job. Returns one JobResult or exception per job, in
+# order, so one failure does not stop the rest.
+def run_jobs(jobs, max_workers=DEFAULT_WORKERS, **options):
+    def run_one(arguments):
+        try:
+            return run_job(arguments, **options)
+        except (OSError, FFmpegError) as e:
+            return e
+
+    if max_workers <= 1 or len(jobs) <= 1:
+        return [run_one(arguments) for arguments in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_one, jobs))
+
+
+class StreamJob:
+    """One ffmpeg/ffprobe process whose stdin (pipe_stdin) or stdout (pipe_stdout) is
+    streamed by the caller; the other standard streams are not connected. A watcher
+    thread kills the process after timeout seconds and records when it exits. Use it as
+    a context manager so the process is killed if the caller stops early."""
+
+    def __init__(self, arguments, binary='ffmpeg', timeout=DEFAULT_TIMEOUT, pipe_stdin=False,
+                 pipe_stdout=False):
+        self.binary = binary
+        self.command = [binary_path(binary)] + [str(argument) for argument in arguments]
+        self.timeout = timeout
+        self.timed_out = False
+        self.finished = None  # time.monotonic() when the process exited
+        self.stderr_file = tempfile.TemporaryFile()
+        self.started = time.monotonic()
+        try:
+            self.process = subprocess.Popen(self.command,
+                                            stdin=subprocess.PIPE if pipe_stdin else subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE if pipe_stdout else subprocess.DEVNULL,
+                                            stderr=self.stderr_file)
+        except BaseException:
+            self.stderr_file.close()
+            raise
+        self.stdin = self.process.stdin
+        self.stdout = self.process.stdout
+        self.watcher = threading.Thread(target=self._watch, daemon=True)
+        self.watcher.start()
+
+    def _watch(self):
+        try:
+            self.process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.timed_out = True
+            self.process.kill()
+            self.process.wait()
+        self.finished = time.monotonic()
+
+    # Function to signal the end of the input (a process that already exited is not an error)
+    def close_input(self):
+        if self.stdin is not None and not self.stdin.closed:
+            try:
+                self.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    # Function to close the input and wait for the process. Raises FFmpegError on a non-zero
+    # exit or timeout; returns a JobResult whose seconds run from start to exit.
+    def finish(self):
+        self.close_input()
+        self.watcher.join()
+        if self.stdout is not None:
+            self.stdout.close()
+        self.stderr_file.seek(0)
+        stderr = _stderr_tail(self.stderr_file.read())
+        self.stderr_file.close()
+        if self.timed_out:
+            raise FFmpegError(f"{self.binary} timed out after {self.timeout:g}s" + (f": {stderr}" if stderr else ""),
+                              self.command, None, stderr)
+        if self.process.returncode != 0:
+            raise FFmpegError(stderr or f"{self.binary} exited with status {self.process.returncode}",
+                              self.command, self.process.returncode, stderr)
+        return JobResult(self.command, None, stderr, 1, self.finished - self.started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.close_input()
+        self.watcher.join()
+        if self.stdout is not None:
+            self.stdout.close()
+        self.stderr_file.close()
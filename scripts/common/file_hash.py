@@ -0,0 +1,19 @@
+"""
+file_hash.py
+
+Content hashing shared by the incremental tools (split manifests, conversion
+indexes and analysis caches).
+"""
+
+import hashlib
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+# Function to hash a file's contents in fixed-size blocks
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,44 @@
+"""
+pcm.py
+
+NumPy helpers for reading uncompressed WAV sample data as float32 frames, either
+block by block from a file or straight out of a memory-mapped buffer.
+"""
+
+import numpy as np
+
+from common import wav_io
+
+
+# Function to convert raw little-endian PCM bytes into float32 frames of shape (n, channels)
+def pcm_to_float(raw, info):
+    bits = info.bits_per_sample
+    if info.sample_format == wav_io.WAVE_FORMAT_IEEE_FLOAT:
+        samples = np.frombuffer(raw, dtype='<f4' if bits == 32 else '<f8').astype(np.float32)
+    elif bits == 8:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif bits == 16:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif bits == 24:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    else:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    return samples.reshape(-1, info.channels)
+
+
+# Function to read an uncompressed WAV's data chunk as float32 blocks of block_frames frames
+def iter_wav_blocks(path, info, block_frames):
+    block_bytes = max(1, block_frames) * info.block_align
+    with open(path, 'rb') as f:
+        f.seek(info.data_offset)
+        remaining = info.data_size
+        while remaining > 0:
+            raw = f.read(min(block_bytes, remaining))
+            if not raw:
+                break
+            remaining -= len(raw)
+            usable = len(raw) - len(raw) % info.block_align
+            yield pcm_to_float(raw[:usable], info)
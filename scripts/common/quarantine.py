@@ -0,0 +1,159 @@
+"""
+quarantine.py
+
+Recoverable deletion for the cleanup tools. Instead of removing files, a batch
+is moved into a holding directory on the same filesystem (one rename per file,
+whatever its size), keeping the files' relative paths. Each batch has one
+manifest: the rename journal from bulk_rename.py, so an interrupted batch can be
+resumed and restoring a batch replays its manifest backwards. Purging removes
+quarantined files for good on a thread pool.
+
+Layout:
+    <folder>/.quarantine/<batch id>/manifest.jsonl
+    <folder>/.quarantine/<batch id>/<relative path of each file>
+"""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from common.bulk_rename import (RenamePlan, SkippedRename, apply_plan, new_batch_id, pending_batch,
+                                read_journal, resume, undo_last)
+
+QUARANTINE_DIR = ".quarantine"
+MANIFEST_FILE = "manifest.jsonl"
+
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+
+# Function to get the holding directory for a folder
+def quarantine_root(folder):
+    return os.path.join(os.path.abspath(folder), QUARANTINE_DIR)
+
+
+def manifest_path(folder, batch_id):
+    return os.path.join(quarantine_root(folder), batch_id, MANIFEST_FILE)
+
+
+# Function to plan moving files (all inside folder) into a new quarantine batch. Files on
+# another filesystem than the holding directory are skipped, since moving them would
+# mean copying.
+def plan_quarantine(folder, paths, batch_id=None):
+    folder = os.path.abspath(folder)
+    batch_id = batch_id or new_batch_id()
+    batch_dir = os.path.join(quarantine_root(folder), batch_id)
+    quarantine_device = os.stat(folder).st_dev
+    devices = {}
+    steps = []
+    skipped = []
+    for path in paths:
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        if directory not in devices:
+            try:
+                devices[directory] = os.stat(directory).st_dev
+            except OSError:
+                devices[directory] = None
+        if devices[directory] != quarantine_device:
+            skipped.append(SkippedRename(path, None, "not on the same filesystem as the quarantine folder"))
+            continue
+        steps.append((path, os.path.join(batch_dir, os.path.relpath(path, folder))))
+    return RenamePlan(steps, steps, skipped, batch_id)
+
+
+# Function to move the files of a plan into quarantine. Returns the batch id.
+def quarantine_files(folder, plan, progress=None):
+    for directory in sorted({os.path.dirname(dst) for _, dst in plan.steps}):
+        os.makedirs(directory, exist_ok=True)
+    os.makedirs(os.path.join(quarantine_root(folder), plan.batch_id), exist_ok=True)
+    return apply_plan(plan, manifest_path(folder, plan.batch_id), progress)
+
+
+# Function to list a folder's quarantine batches, oldest first, as
+# [(batch id, files held, interrupted)]
+def list_batches(folder):
+    root = quarantine_root(folder)
+    try:
+        names = sorted(entry.name for entry in os.scandir(root) if entry.is_dir())
+    except FileNotFoundError:
+        return []
+    batches = []
+    for batch_id in names:
+        journal = read_journal(os.path.join(root, batch_id, MANIFEST_FILE)).get(batch_id)
+        if journal is not None:
+            batches.append((batch_id, len(journal['done']), not journal['committed']))
+    return batches
+
+
+# Function to restore a batch (default: the newest) by replaying its manifest backwards.
+# Returns (batch id, files restored), or None when there is nothing to restore.
+def restore_batch(folder, batch_id=None, progress=None):
+    batches = list_batches(folder)
+    if batch_id is None:
+        if not batches:
+            return None
+        batch_id = batches[-1][0]
+    journal_path = manifest_path(folder, batch_id)
+    pending = pending_batch(journal_path)
+    if pending is not None and pending[1]['undoes']:
+        # A restore of this batch was interrupted; finish it
+        count = resume(journal_path, progress)
+    else:
+        batch = read_journal(journal_path).get(batch_id)
+        if batch is None:
+            return None
+        # Recreate folders that were removed since the files were quarantined
+        for index in batch['done']:
+            os.makedirs(os.path.dirname(batch['steps'][index][0]), exist_ok=True)
+        undone = undo_last(journal_path, progress)
+        if undone is None:
+            return None
+        count = undone[1]
+    shutil.rmtree(os.path.join(quarantine_root(folder), batch_id))
+    return batch_id, count
+
+
+# Function to delete files on a thread pool. Returns (files removed, [error messages]);
+# files that are already gone are not errors.
+def remove_files(paths, max_workers=DEFAULT_WORKERS, progress=None):
+    def remove_one(path):
+        try:
+            os.remove(path)
+            return True, None
+        except FileNotFoundError:
+            return False, None
+        except OSError as e:
+            return False, f"Error deleting file '{path}': {e}"
+
+    removed = 0
+    errors = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for done, (ok, error) in enumerate(executor.map(remove_one, paths, chunksize=64), 1):
+            removed += ok
+            if error:
+                errors.append(error)
+            if progress:
+                progress(done, len(paths))
+    return removed, errors
+
+
+# Function to permanently delete quarantine batches (default: all of them). Returns
+# (files removed, [error messages]). A batch is only dropped once all its files are gone.
+def purge_batches(folder, batch_ids=None, max_workers=DEFAULT_WORKERS, progress=None):
+    root = quarantine_root(folder)
+    if batch_ids is None:
+        batch_ids = [batch_id for batch_id, _, _ in list_batches(folder)]
+    paths = []
+    for batch_id in batch_ids:
+        for directory, _, files in os.walk(os.path.join(root, batch_id)):
+            paths.extend(os.path.join(directory, name) for name in files if name != MANIFEST_FILE
+                         or directory != os.path.join(root, batch_id))
+    removed, errors = remove_files(paths, max_workers, progress)
+    if not errors:
+        for batch_id in batch_ids:
+            shutil.rmtree(os.path.join(root, batch_id), ignore_errors=True)
+        try:
+            os.rmdir(root)
+        except OSError:
+            pass  # Other batches (or unrelated files) are still there
+    return removed, errors
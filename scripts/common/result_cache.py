@@ -0,0 +1,84 @@
+"""
+result_cache.py
+
+On-disk cache for per-file analysis results (loudness, audio health) keyed by
+content hash, so renamed or copied files are not analyzed again. A second index
+maps path, size and mtime to the hash so unchanged files are not re-hashed
+either. Safe to share between worker threads.
+"""
+
+import json
+import os
+import threading
+
+from common.file_hash import file_sha256
+
+
+class ResultCache:
+    """JSON-backed results keyed by sha256, plus a path/size/mtime -> hash index."""
+
+    def __init__(self, cache_path, version):
+        self.cache_path = cache_path
+        self.version = version
+        self.data = None
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.data is not None:
+            return
+        self.data = {'version': self.version, 'paths': {}, 'results': {}}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    # Function to get the hash recorded for a path, or None if the file changed since
+    def known_hash(self, path, stat_result):
+        with self.lock:
+            self._load()
+            entry = self.data['paths'].get(path)
+        if entry and entry['size'] == stat_result.st_size and entry['mtime_ns'] == stat_result.st_mtime_ns:
+            return entry['sha256']
+        return None
+
+    def record_hash(self, path, stat_result, digest):
+        with self.lock:
+            self._load()
+            self.data['paths'][path] = {'size': stat_result.st_size, 'mtime_ns': stat_result.st_mtime_ns,
+                                        'sha256': digest}
+            self.dirty = True
+
+    # Function to get a file's content hash, hashing it only when it changed
+    def content_hash(self, path):
+        stat_result = os.stat(path)
+        digest = self.known_hash(path, stat_result)
+        if digest is None:
+            digest = file_sha256(path)
+            self.record_hash(path, stat_result, digest)
+        return digest
+
+    def get(self, digest):
+        with self.lock:
+            self._load()
+            return self.data['results'].get(digest)
+
+    def put(self, digest, result):
+        with self.lock:
+            self._load()
+            self.data['results'][digest] = result
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
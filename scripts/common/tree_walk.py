@@ -0,0 +1,56 @@
+"""
+tree_walk.py
+
+Parallel directory walker for large project trees. Each directory is listed
+once with os.scandir on a thread pool (directory listing is I/O bound and
+releases the GIL), and subdirectories are queued as soon as their parent has
+been read, so deep and wide trees are walked concurrently.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# One directory listing: its mtime, the names of its files and subdirectories, and the
+# OSError that stopped it being read (files and dirs are then empty)
+DirListing = namedtuple('DirListing', ['mtime_ns', 'files', 'dirs', 'error'])
+
+
+# Function to list one directory. Symlinked directories are reported as files so the
+# walk never follows links into loops.
+def scan_dir(path):
+    files = []
+    dirs = []
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry.name)
+    except OSError as e:
+        return DirListing(None, [], [], e)
+    return DirListing(mtime_ns, files, dirs, None)
+
+
+# Function to walk a tree in parallel. Returns {directory path: DirListing} for the root
+# and every directory below it; skip_dir(path, name) can prune subdirectories.
+def walk_tree(root, max_workers=DEFAULT_WORKERS, skip_dir=None):
+    listings = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(scan_dir, root): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                listing = future.result()
+                listings[path] = listing
+                for name in listing.dirs:
+                    if skip_dir is None or not skip_dir(path, name):
+                        child = os.path.join(path, name)
+                        pending[executor.submit(scan_dir, child)] = child
+    return listings
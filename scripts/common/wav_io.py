@@ -0,0 +1,109 @@
+"""
+wav_io.py
+
+Minimal RIFF/WAVE reader and writer shared by the audio scripts. Reads the
+header layout of uncompressed WAV files so sample data can be copied or
+streamed directly, without an FFmpeg decode/encode round trip.
+"""
+
+import struct
+from collections import namedtuple
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Largest data chunk a plain (non-RF64) RIFF header can describe
+MAX_DATA_SIZE = 0xFFFFFFFF - 36
+
+
+class WavInfo(namedtuple('WavInfo', [
+        'format_tag', 'channels', 'sample_rate', 'bits_per_sample',
+        'block_align', 'data_offset', 'data_size', 'fmt_chunk'])):
+    """Header layout of a WAV file. ``fmt_chunk`` holds the raw fmt payload."""
+    __slots__ = ()
+
+    @property
+    def num_frames(self):
+        return self.data_size // self.block_align
+
+    @property
+    def duration(self):
+        return self.num_frames / self.sample_rate
+
+    @property
+    def sample_format(self):
+        # Resolve WAVE_FORMAT_EXTENSIBLE to the sub-format carried in its GUID
+        if self.format_tag == WAVE_FORMAT_EXTENSIBLE and len(self.fmt_chunk) >= 26:
+            return struct.unpack_from('<H', self.fmt_chunk, 24)[0]
+        return self.format_tag
+
+    @property
+    def is_uncompressed(self):
+        # Integer PCM and IEEE float frames can be copied byte-for-byte
+        if self.sample_format == WAVE_FORMAT_PCM:
+            return self.bits_per_sample in (8, 16, 24, 32)
+        if self.sample_format == WAVE_FORMAT_IEEE_FLOAT:
+            return self.bits_per_sample in (32, 64)
+        return False
+
+
+# Function to read the header layout of a WAV file (path or binary file object)
+def read_wav_info(source):
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'rb') as f:
+            return read_wav_info(f)
+
+    f = source
+    f.seek(0, 2)
+    file_size = f.tell()
+    f.seek(0)
+    riff = f.read(12)
+    if len(riff) < 12 or riff[0:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt_chunk = None
+    position = 12
+    while position + 8 <= file_size:
+        f.seek(position)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        body_offset = position + 8
+        if chunk_id == b'fmt ':
+            fmt_chunk = f.read(chunk_size)
+            if len(fmt_chunk) < 16:
+                raise ValueError("Truncated fmt chunk")
+        elif chunk_id == b'data':
+            if fmt_chunk is None:
+                raise ValueError("data chunk found before fmt chunk")
+            # Streaming writers leave the size at 0/0xFFFFFFFF; trust the file length then
+            available = file_size - body_offset
+            if chunk_size == 0 or chunk_size > available:
+                chunk_size = available
+            format_tag, channels, sample_rate, _, block_align, bits_per_sample = \
+                struct.unpack_from('<HHIIHH', fmt_chunk)
+            if channels == 0 or sample_rate == 0 or block_align == 0:
+                raise ValueError("Invalid fmt chunk")
+            data_size = chunk_size - chunk_size % block_align
+            return WavInfo(format_tag, channels, sample_rate, bits_per_sample,
+                           block_align, body_offset, data_size, fmt_chunk)
+        position = body_offset + chunk_size + (chunk_size & 1)
+    raise ValueError("No data chunk found")
+
+
+# Function to write a canonical RIFF/WAVE header reusing the source fmt chunk
+def write_wav_header(f, info, data_size):
+    if data_size > MAX_DATA_SIZE - len(info.fmt_chunk):
+        raise ValueError("Clip too large for a RIFF header")
+    fmt_chunk = info.fmt_chunk
+    fmt_padding = b'\x00' * (len(fmt_chunk) & 1)
+    riff_size = 4 + (8 + len(fmt_chunk) + len(fmt_padding)) + (8 + data_size + (data_size & 1))
+    f.write(struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE'))
+    f.write(struct.pack('<4sI', b'fmt ', len(fmt_chunk)))
+    f.write(fmt_chunk + fmt_padding)
+    f.write(struct.pack('<4sI', b'data', data_size))
+
+
+# Function to pad a data chunk written after write_wav_header to an even length
+def write_wav_padding(f, data_size):
+    if data_size & 1:
+        f.write(b'\x00')
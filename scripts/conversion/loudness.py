@@ -0,0 +1,194 @@
+"""
+loudness.py
+
+Integrated loudness (ITU-R BS.1770 / EBU R128) and true-peak measurement for the
+delivery converter, vectorized with NumPy and streamed block by block. The
+K-weighting filter is applied as an FFT overlap-add convolution with its
+(truncated) impulse response, and true peak uses 4x polyphase oversampling.
+Measurements are cached per file content hash so re-deliveries skip analysis.
+"""
+
+import math
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import audio_probe, pcm, wav_io
+from common.result_cache import ResultCache
+
+CACHE_VERSION = 2
+
+# Gating block is 400 ms with 75% overlap, measured as four 100 ms segments
+SEGMENT_SECONDS = 0.1
+SEGMENTS_PER_BLOCK = 4
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# K-weighting impulse response length and true-peak oversampling settings
+IMPULSE_SECONDS = 0.2
+OVERSAMPLING = 4
+TAPS_PER_PHASE = 16
+
+
+# Function to compute biquad coefficients (b, a) for the two K-weighting stages at a sample
+# rate, using the bilinear-transform parameters that reproduce the BS.1770 48 kHz filters
+def k_weighting_biquads(sample_rate):
+    # Stage 1: high shelf (+4 dB above ~1.7 kHz)
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / sample_rate)
+    vh = 10 ** (gain_db / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf = (
+        [(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+        [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0],
+    )
+    # Stage 2: high pass (~38 Hz)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / sample_rate)
+    a0 = 1.0 + k / q + k * k
+    high_pass = (
+        [1.0, -2.0, 1.0],
+        [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0],
+    )
+    return [shelf, high_pass]
+
+
+# Function to compute the truncated impulse response of the K-weighting filter cascade.
+# It depends only on the sample rate, so it is computed once per rate and reused.
+@lru_cache(maxsize=None)
+def k_weighting_impulse(sample_rate):
+    length = int(IMPULSE_SECONDS * sample_rate)
+    signal = [0.0] * length
+    signal[0] = 1.0
+    for b, a in k_weighting_biquads(sample_rate):
+        b = [value / a[0] for value in b]
+        a = [value / a[0] for value in a]
+        x1 = x2 = y1 = y2 = 0.0
+        output = []
+        for x in signal:
+            y = b[0] * x + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+            x2, x1, y2, y1 = x1, x, y1, y
+            output.append(y)
+        signal = output
+    impulse = np.array(signal, dtype=np.float64)
+    impulse.flags.writeable = False  # Shared by every file at this rate
+    return impulse
+
+
+# Function to design the 4x polyphase interpolation filter used for true-peak detection
+def oversampling_phases():
+    taps = OVERSAMPLING * TAPS_PER_PHASE
+    n = np.arange(taps) - (taps - 1) / 2.0
+    kernel = np.sinc(n / OVERSAMPLING) * np.blackman(taps)
+    phases = kernel.reshape(TAPS_PER_PHASE, OVERSAMPLING).T.copy()
+    return phases / phases.sum(axis=1, keepdims=True)
+
+
+# Function to get BS.1770 channel weights (surround channels of 5.1 weigh 1.41, LFE 0)
+def channel_weights(channels):
+    if channels == 6:
+        return np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+    return np.ones(channels)
+
+
+# Function to measure integrated loudness (LUFS) and true peak (dBTP) of an uncompressed WAV.
+# Memory is bounded by the block size plus one 100 ms energy value per channel.
+def measure_wav(path, block_seconds=10.0):
+    info = wav_io.read_wav_info(path)
+    if not info.is_uncompressed:
+        raise ValueError("Loudness measurement needs an uncompressed WAV")
+    sample_rate = info.sample_rate
+    segment = max(1, int(round(SEGMENT_SECONDS * sample_rate)))
+    block_frames = max(segment, int(block_seconds * sample_rate) // segment * segment)
+
+    impulse = k_weighting_impulse(sample_rate)
+    fft_size = 1 << int(math.ceil(math.log2(block_frames + len(impulse) - 1)))
+    impulse_spectrum = np.fft.rfft(impulse, fft_size)[:, None]
+    phases = oversampling_phases()
+
+    overlap = np.zeros((len(impulse) - 1, info.channels))   # Filter tail carried into the next block
+    filtered_rest = np.zeros((0, info.channels))            # Filtered samples short of a full segment
+    history = np.zeros((TAPS_PER_PHASE - 1, info.channels))  # Input carried into the interpolator
+    segment_energy = []
+    peak = 0.0
+
+    for block in pcm.iter_wav_blocks(path, info, block_frames):
+        frames = len(block)
+        # K-weighting via overlap-add: full convolution of this block plus the previous tail
+        convolved = np.fft.irfft(np.fft.rfft(block, fft_size, axis=0) * impulse_spectrum, fft_size, axis=0)
+        convolved = convolved[:frames + len(impulse) - 1]
+        convolved[:len(overlap)] += overlap
+        overlap = convolved[frames:].copy()
+        filtered = np.concatenate((filtered_rest, convolved[:frames]))
+        whole = len(filtered) // segment * segment
+        segment_energy.append(np.mean(np.square(filtered[:whole]).reshape(-1, segment, info.channels), axis=1))
+        filtered_rest = filtered[whole:]
+
+        # True peak: interpolate every phase of the 4x oversampled signal per channel
+        extended = np.concatenate((history, block))
+        for channel in range(info.channels):
+            for phase in phases:
+                values = np.convolve(extended[:, channel], phase, mode='valid')
+                if len(values):
+                    peak = max(peak, float(np.max(np.abs(values))))
+        peak = max(peak, float(np.max(np.abs(block))) if frames else 0.0)
+        history = extended[-(TAPS_PER_PHASE - 1):]
+
+    true_peak = 20 * math.log10(peak) if peak > 0 else float('-inf')
+    if not segment_energy:
+        return {'integrated': float('-inf'), 'true_peak': true_peak}
+
+    # Gating blocks: 400 ms windows stepping by 100 ms, channel-weighted
+    energy = np.concatenate(segment_energy) @ channel_weights(info.channels)
+    if len(energy) < SEGMENTS_PER_BLOCK:
+        blocks = np.array([energy.mean()])
+    else:
+        cumulative = np.concatenate(([0.0], np.cumsum(energy)))
+        blocks = (cumulative[SEGMENTS_PER_BLOCK:] - cumulative[:-SEGMENTS_PER_BLOCK]) / SEGMENTS_PER_BLOCK
+    with np.errstate(divide='ignore'):
+        block_loudness = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[block_loudness > ABSOLUTE_GATE]
+    if not len(gated):
+        return {'integrated': float('-inf'), 'true_peak': true_peak}
+    relative_threshold = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = blocks[(block_loudness > ABSOLUTE_GATE) & (block_loudness > relative_threshold)]
+    return {'integrated': -0.691 + 10 * math.log10(gated.mean()), 'true_peak': true_peak}
+
+
+# Function to compute the gain (dB) that brings a measurement to the target loudness
+# without pushing the true peak over the ceiling
+def normalization_gain(measurement, target_lufs, max_true_peak):
+    if not math.isfinite(measurement['integrated']):
+        return 0.0
+    gain = target_lufs - measurement['integrated']
+    if math.isfinite(measurement['true_peak']):
+        gain = min(gain, max_true_peak - measurement['true_peak'])
+    return gain
+
+
+class LoudnessCache(ResultCache):
+    """Loudness measurements keyed by content hash. Safe to share between conversion
+    worker threads."""
+
+    def __init__(self, cache_path):
+        super().__init__(cache_path, CACHE_VERSION)
+
+    def measure(self, path):
+        path = os.path.abspath(path)
+        digest = self.content_hash(path)
+        cached = self.get(digest)
+        if cached is not None:
+            return {key: value if value is not None else float('-inf') for key, value in cached.items()}
+        measurement = measure_wav(path)
+        # JSON has no infinities; silent files are stored as None
+        self.put(digest, {key: value if math.isfinite(value) else None for key, value in measurement.items()})
+        return measurement
+
+
+# Function to open the shared per-user loudness cache
+def default_cache():
+    return LoudnessCache(os.path.join(audio_probe.cache_dir(), 'loudness_cache.json'))
@@ -1,53 +1,416 @@
 """
 wav_to_mp3_gui.py
 
-Batch conversion helper for preparing delivery formats (WAV to MP3). Uses FFmpeg
-through pydub and is intended for local-file workflows.
+Batch conversion helper for preparing delivery formats (WAV to MP3 and other
+delivery profiles). PCM WAVs are streamed block by block into FFmpeg; anything
+else is handed to FFmpeg as a file through the shared job runner
+(common/ffmpeg_jobs.py). Intended for local-file workflows.
 """
 
+import json
 import os
+import queue
+import sys
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tkinter import filedialog, messagebox, scrolledtext
-from pydub import AudioSegment
-AudioSegment.converter = "/opt/homebrew/bin/ffmpeg"
-AudioSegment.ffprobe   = "/opt/homebrew/bin/ffprobe"
+
+# Shared helpers live in scripts/common, one level above this script's folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import audio_probe, ffmpeg_jobs, wav_io
+from common.file_hash import file_sha256
+
+# Default number of files encoded at once (each encode runs in its own ffmpeg process)
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Log lines from worker threads; drained into log_area on the Tk thread
+log_queue = queue.Queue()
 
 def log_message(msg):
-    log_area.insert(tk.END, msg + "\n")
-    log_area.see(tk.END)  # Auto-scroll to the bottom
+    log_queue.put(msg)
+
+def drain_log_queue():
+    lines = []
+    while True:
+        try:
+            lines.append(log_queue.get_nowait())
+        except queue.Empty:
+            break
+    if lines:
+        log_area.insert(tk.END, "\n".join(lines) + "\n")
+        log_area.see(tk.END)  # Auto-scroll to the bottom
+    if conversion_thread is not None and not conversion_thread.is_alive() and log_queue.empty():
+        finish_conversion()
+    root.after(100, drain_log_queue)
+
+# Size of the PCM blocks piped into the encoders by the streaming path
+STREAM_BLOCK_BYTES = 1024 * 1024
+
+# Named delivery profiles: container/codec settings and the subfolder of converted/
+# they are written to. "MP3 192k" writes to converted/ itself, as before profiles existed.
+DELIVERY_PROFILES = {
+    "MP3 192k": {"extension": ".mp3", "format": "mp3", "codec": "libmp3lame", "bitrate": "192k",
+                 "sample_rate": None, "sample_fmt": None, "subfolder": ""},
+    "AAC 256k": {"extension": ".m4a", "format": "mp4", "codec": "aac", "bitrate": "256k",
+                 "sample_rate": 48000, "sample_fmt": None, "subfolder": "aac"},
+    "FLAC 16-bit": {"extension": ".flac", "format": "flac", "codec": "flac", "bitrate": None,
+                    "sample_rate": None, "sample_fmt": "s16", "subfolder": "flac"},
+}
+DEFAULT_PROFILES = ("MP3 192k",)
+
+def profile_output_path(converted_folder, relative, profile_name):
+    profile = DELIVERY_PROFILES[profile_name]
+    return os.path.join(converted_folder, profile["subfolder"], os.path.splitext(relative)[0] + profile["extension"])
+
+# Function to build the ffmpeg output options for a delivery profile
+def encoder_arguments(profile):
+    arguments = ["-c:a", profile["codec"]]
+    if profile["bitrate"]:
+        arguments += ["-b:a", profile["bitrate"]]
+    if profile["sample_rate"]:
+        arguments += ["-ar", str(profile["sample_rate"])]
+    if profile["sample_fmt"]:
+        arguments += ["-sample_fmt", profile["sample_fmt"]]
+    return arguments
+
+# Function to build the ffmpeg filter options that apply a normalization gain
+def gain_arguments(gain_db):
+    if not gain_db:
+        return []
+    return ["-af", f"volume={gain_db:.2f}dB"]
+
+# Function to map a WAV header to the matching ffmpeg raw input format (None if unsupported)
+def raw_input_format(info):
+    if not info.is_uncompressed:
+        return None
+    if info.sample_format == wav_io.WAVE_FORMAT_IEEE_FLOAT:
+        return {32: "f32le", 64: "f64le"}.get(info.bits_per_sample)
+    return {8: "u8", 16: "s16le", 24: "s24le", 32: "s32le"}.get(info.bits_per_sample)
+
+# Function to encode a WAV to every requested profile from one read of its PCM data.
+# Fixed-size blocks are piped into one ffmpeg encoder per profile, so memory use stays
+# constant however long the file is. outputs is a list of (profile name, output path);
+# gain_db is applied by the encoders. Returns {profile name: {"seconds", "bytes", "error"}}.
+def stream_encode(wav_path, info, raw_format, outputs, gain_db=0.0):
+    input_arguments = ["-f", raw_format, "-ar", str(info.sample_rate), "-ac", str(info.channels), "-i", "pipe:0"]
+    encoders = []
+    results = {}
+    try:
+        for profile_name, output_path in outputs:
+            arguments = ["-y", "-v", "error"] + input_arguments + gain_arguments(gain_db) + \
+                encoder_arguments(DELIVERY_PROFILES[profile_name]) + [output_path]
+            encoders.append((profile_name, output_path, ffmpeg_jobs.StreamJob(arguments, pipe_stdin=True)))
+
+        active = [job for _, _, job in encoders]
+        with open(wav_path, "rb") as source:
+            source.seek(info.data_offset)
+            remaining = info.data_size
+            block_size = STREAM_BLOCK_BYTES - STREAM_BLOCK_BYTES % info.block_align
+            while remaining > 0 and active:
+                block = source.read(min(block_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                for job in list(active):
+                    try:
+                        job.stdin.write(block)
+                    except BrokenPipeError:
+                        active.remove(job)  # Encoder exited early; its exit status explains why
+    finally:
+        # Close every input first so the encoders finish side by side; each job records
+        # its own exit time
+        for _, _, job in encoders:
+            job.close_input()
+        for profile_name, output_path, job in encoders:
+            with job:
+                try:
+                    seconds = job.finish().seconds
+                    error = None
+                except ffmpeg_jobs.FFmpegError as e:
+                    seconds = job.finished - job.started
+                    error = str(e)
+            results[profile_name] = {
+                "seconds": seconds,
+                "bytes": os.path.getsize(output_path) if error is None and os.path.isfile(output_path) else 0,
+                "error": error,
+            }
+    return results
 
-def convert_wavs_to_mp3(folder_path):
+# Function to encode every requested profile by handing the file to ffmpeg, one profile after
+# another so the converter's worker limit still bounds the number of ffmpeg processes (for
+# compressed or unusual WAVs that cannot be streamed)
+def file_encode(wav_path, outputs, gain_db=0.0):
+    jobs = [["-y", "-v", "error", "-i", wav_path] + gain_arguments(gain_db) +
+            encoder_arguments(DELIVERY_PROFILES[profile_name]) + [output_path]
+            for profile_name, output_path in outputs]
+    started = time.monotonic()
+    results = {}
+    for (profile_name, output_path), outcome in zip(outputs, ffmpeg_jobs.run_jobs(jobs, max_workers=1)):
+        if isinstance(outcome, Exception):
+            results[profile_name] = {"seconds": time.monotonic() - started, "bytes": 0, "error": str(outcome)}
+        else:
+            results[profile_name] = {"seconds": outcome.seconds, "bytes": os.path.getsize(output_path),
+                                     "error": None}
+    try:
+        audio_seconds = audio_probe.probe_audio(wav_path)["duration"]
+    except (OSError, ValueError):
+        audio_seconds = 0.0
+    return audio_seconds, results
+
+# Function to convert one source to every (profile name, output path) in outputs. With
+# normalization settings, the source is measured (or looked up in loudness_cache) and the
+# gain is applied by the encoders. Returns None if the batch was cancelled, else
+# (audio seconds, gain in dB, per-profile results).
+def convert_one(wav_path, outputs, cancel_event, normalization=None, loudness_cache=None):
+    if cancel_event.is_set():
+        return None
+    try:
+        info = wav_io.read_wav_info(wav_path)
+        raw_format = raw_input_format(info)
+    except ValueError:
+        raw_format = None
+    gain_db = 0.0
+    if normalization is not None:
+        if not raw_format:
+            raise ValueError("Loudness normalization needs an uncompressed WAV")
+        from loudness import normalization_gain
+        gain_db = normalization_gain(loudness_cache.measure(wav_path),
+                                     normalization["target_lufs"], normalization["max_true_peak"])
+    if raw_format:
+        return (info.duration, gain_db) + (stream_encode(wav_path, info, raw_format, outputs, gain_db),)
+    # Compressed or unusual WAVs are decoded by ffmpeg from the file itself
+    audio_seconds, results = file_encode(wav_path, outputs)
+    return audio_seconds, gain_db, results
+
+# Sidecar index of converted sources kept in the output folder by recursive mode
+INDEX_FILE = ".convert_index.json"
+INDEX_VERSION = 2
+INDEX_SAVE_EVERY = 50  # Index updates between saves, so an interrupted run keeps its progress
+
+# Function to list (source path, relative name) for every WAV to convert. Flat mode reads
+# folder_path only; recursive mode walks the tree so outputs can mirror it under converted/.
+def list_wav_jobs(folder_path, converted_folder, recursive):
+    if not recursive:
+        return [(os.path.join(folder_path, f), f) for f in os.listdir(folder_path) if f.lower().endswith(".wav")]
+    jobs = []
+    for dir_path, dir_names, file_names in os.walk(folder_path):
+        # Never descend into the output tree
+        dir_names[:] = [d for d in dir_names if os.path.join(dir_path, d) != converted_folder]
+        for f in file_names:
+            if f.lower().endswith(".wav"):
+                wav_path = os.path.join(dir_path, f)
+                jobs.append((wav_path, os.path.relpath(wav_path, folder_path)))
+    return jobs
+
+def load_convert_index(converted_folder):
+    try:
+        with open(os.path.join(converted_folder, INDEX_FILE), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "files": {}}
+
+def save_convert_index(converted_folder, index):
+    index_path = os.path.join(converted_folder, INDEX_FILE)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(temp_path, index_path)
+
+# Function to check a source against its index entry. Size and mtime matching is enough;
+# a touched file with the same size is hashed and counts as unchanged if its content is.
+# Returns (unchanged, stat result, known hash or None).
+def is_unchanged(entry, wav_path):
+    stat_result = os.stat(wav_path)
+    if not entry or entry["size"] != stat_result.st_size:
+        return False, stat_result, None
+    if entry["mtime_ns"] == stat_result.st_mtime_ns:
+        return True, stat_result, entry["sha256"]
+    digest = file_sha256(wav_path)
+    return digest == entry["sha256"], stat_result, digest
+
+# Function to describe a source for its index entry. known is the (stat result, hash) taken
+# by is_unchanged; the hash is reused while the file's size and mtime still match it.
+def index_source(wav_path, known=None):
+    stat_result = os.stat(wav_path)
+    if known is not None and (known[0].st_size, known[0].st_mtime_ns) == \
+            (stat_result.st_size, stat_result.st_mtime_ns):
+        digest = known[1]
+    else:
+        digest = file_sha256(wav_path)
+    return {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns, "sha256": digest}
+
+# Function to run convert_one in a worker and, for a source new to the recursive index,
+# describe it there too once a profile succeeded, so hashing stays off the collecting thread
+# and its errors are reported like conversion errors. Returns None if cancelled, else
+# convert_one's result plus the index_source result (None when not needed).
+def convert_and_describe(wav_path, outputs, cancel_event, normalization=None, loudness_cache=None,
+                         describe=False, known=None):
+    outcome = convert_one(wav_path, outputs, cancel_event, normalization, loudness_cache)
+    if outcome is None:
+        return None
+    succeeded = any(not result["error"] for result in outcome[2].values())
+    return outcome + (index_source(wav_path, known) if describe and succeeded else None,)
+
+# Function to log the per-profile totals collected by convert_wavs_to_mp3
+def log_profile_stats(profile_stats):
+    for profile_name, stats in profile_stats.items():
+        if not stats["files"]:
+            continue
+        speed = stats["audio_seconds"] / stats["encode_seconds"] if stats["encode_seconds"] else 0.0
+        log_message(f"  {profile_name}: {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB, "
+                    f"{speed:.1f}x realtime per encoder")
+
+# Converts every WAV in folder_path to the selected delivery profiles with up to max_workers
+# sources at once. Safe to run off the Tk thread: progress goes through log_message and
+# cancel_event stops the batch. Recursive mode mirrors the whole tree and skips profiles
+# whose source is unchanged since the last run. normalization ({"target_lufs",
+# "max_true_peak"}) brings every file to a target loudness in the same pass as the encode.
+def convert_wavs_to_mp3(folder_path, max_workers=DEFAULT_WORKERS, cancel_event=None, recursive=False,
+                        profiles=DEFAULT_PROFILES, normalization=None):
+    cancel_event = cancel_event or threading.Event()
     folder_path = os.path.expanduser(folder_path.strip())
     if not os.path.isdir(folder_path):
-        messagebox.showerror("Invalid Path", f"Folder not found:\n{folder_path}")
+        log_message(f"Folder not found: {folder_path}")
         return
+    if not profiles:
+        log_message("No delivery profiles selected.")
+        return
+
+    loudness_cache = None
+    if normalization is not None:
+        from loudness import default_cache  # Needs NumPy, which is only required for normalization
+        loudness_cache = default_cache()
 
     converted_folder = os.path.join(folder_path, "converted")
     os.makedirs(converted_folder, exist_ok=True)
 
-    wav_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".wav")]
+    jobs = list_wav_jobs(folder_path, converted_folder, recursive)
 
-    if not wav_files:
-        messagebox.showinfo("No Files", "No WAV files found in the selected folder.")
+    if not jobs:
+        log_message("No WAV files found in the selected folder.")
         return
 
-    log_area.delete(1.0, tk.END)
-    log_message(f"Found {len(wav_files)} WAV files.")
-    log_message(f"Converting to: {converted_folder}")
+    index = load_convert_index(converted_folder) if recursive else None
+    pending = []
+    skipped = failed = 0
+    for wav_path, relative in jobs:
+        outputs = [(name, profile_output_path(converted_folder, relative, name)) for name in profiles]
+        known = None
+        if index is not None:
+            entry = index["files"].get(relative)
+            try:
+                unchanged, stat_result, digest = is_unchanged(entry, wav_path)
+            except OSError as e:
+                failed += 1
+                log_message(f"✗ Failed: {relative} — {e}")
+                continue
+            if digest is not None:
+                known = (stat_result, digest)
+            if unchanged and entry.get("normalization") == normalization:
+                entry.update(size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns)
+                outputs = [(name, path) for name, path in outputs
+                           if name not in entry["profiles"] or not os.path.isfile(path)]
+            else:
+                index["files"].pop(relative, None)
+            if not outputs:
+                skipped += 1
+                continue
+        pending.append((wav_path, relative, outputs, known))
 
-    for wav_file in wav_files:
-        wav_path = os.path.join(folder_path, wav_file)
-        mp3_name = os.path.splitext(wav_file)[0] + ".mp3"
-        mp3_path = os.path.join(converted_folder, mp3_name)
+    total_duration = 0.0
+    for wav_path, _, _, _ in pending:
+        try:
+            total_duration += audio_probe.probe_audio(wav_path)['duration']
+        except (OSError, ValueError):
+            pass  # Unreadable files are reported by the conversion loop below
+    audio_probe.save_cache()
+
+    minutes, seconds = divmod(int(total_duration), 60)
+    log_message(f"Found {len(jobs)} WAV files, {len(pending)} to convert ({minutes}:{seconds:02d} of audio).")
+    if skipped:
+        log_message(f"Skipping {skipped} up-to-date files.")
+    log_message(f"Converting to: {converted_folder} as {', '.join(profiles)} ({max_workers} at a time)")
 
+    profile_stats = {name: {"files": 0, "audio_seconds": 0.0, "encode_seconds": 0.0, "bytes": 0} for name in profiles}
+    converted = 0
+    unsaved = 0  # Index entries updated since the last save
+
+    # Function to save the index, logging (not raising) a failure so the batch carries on
+    def save_index():
         try:
-            audio = AudioSegment.from_wav(wav_path)
-            audio.export(mp3_path, format="mp3", bitrate="192k")
-            log_message(f"✓ Converted: {wav_file}")
-        except Exception as e:
-            log_message(f"✗ Failed: {wav_file} — {e}")
+            save_convert_index(converted_folder, index)
+        except OSError as e:
+            log_message(f"✗ Could not save the convert index: {e}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for wav_path, relative, outputs, known in pending:
+            for _, output_path in outputs:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            describe = index is not None and relative not in index["files"]
+            future = executor.submit(convert_and_describe, wav_path, outputs, cancel_event, normalization,
+                                     loudness_cache, describe, known)
+            futures[future] = relative
 
-    log_message("✅ Conversion complete.")
+        for future in as_completed(futures):
+            relative = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                outcome = future.result()
+            except Exception as e:
+                failed += 1
+                log_message(f"✗ Failed: {relative} — {e}")
+                outcome = None
+            if outcome is not None:
+                audio_seconds, gain_db, results, source = outcome
+                errors = {name: result["error"] for name, result in results.items() if result["error"]}
+                for name, result in results.items():
+                    if not result["error"]:
+                        stats = profile_stats[name]
+                        stats["files"] += 1
+                        stats["audio_seconds"] += audio_seconds
+                        stats["encode_seconds"] += result["seconds"]
+                        stats["bytes"] += result["bytes"]
+                if errors:
+                    failed += 1
+                    for name, error in errors.items():
+                        log_message(f"✗ Failed: {relative} [{name}] — {error}")
+                else:
+                    converted += 1
+                    if normalization is not None:
+                        log_message(f"✓ Converted: {relative} (gain {gain_db:+.1f} dB)")
+                    else:
+                        log_message(f"✓ Converted: {relative}")
+                done = [name for name in results if name not in errors]
+                if index is not None and done:
+                    entry = index["files"].get(relative)
+                    if entry is None:
+                        entry = index["files"][relative] = dict(source, normalization=normalization, profiles=[])
+                    entry["profiles"] = sorted(set(entry["profiles"]) | set(done))
+                    unsaved += 1
+                    if unsaved >= INDEX_SAVE_EVERY:
+                        save_index()
+                        unsaved = 0
+            if cancel_event.is_set():
+                for pending_future in futures:
+                    pending_future.cancel()
+
+    if index is not None:
+        save_index()
+    if loudness_cache is not None:
+        loudness_cache.save()
+
+    if cancel_event.is_set():
+        log_message(f"⏹ Cancelled after {converted} files ({failed} failed).")
+    else:
+        log_message(f"✅ Conversion complete: {converted} converted, {skipped} up to date, {failed} failed.")
+    log_profile_stats(profile_stats)
 
 def browse_folder():
     selected = filedialog.askdirectory()
@@ -55,9 +418,53 @@ def browse_folder():
         folder_entry.delete(0, tk.END)
         folder_entry.insert(0, selected)
 
+conversion_thread = None
+cancel_event = threading.Event()
+
 def on_convert_click():
-    folder = folder_entry.get()
-    convert_wavs_to_mp3(folder)
+    global conversion_thread
+    folder = os.path.expanduser(folder_entry.get().strip())
+    if not os.path.isdir(folder):
+        messagebox.showerror("Invalid Path", f"Folder not found:\n{folder}")
+        return
+    try:
+        max_workers = max(1, int(workers_spinbox.get()))
+    except ValueError:
+        messagebox.showerror("Invalid Input", "Please enter a whole number of parallel encodes.")
+        return
+
+    profiles = [name for name, var in profile_vars.items() if var.get()]
+    if not profiles:
+        messagebox.showerror("No Profiles", "Please select at least one delivery profile.")
+        return
+
+    normalization = None
+    if normalize_var.get():
+        try:
+            normalization = {"target_lufs": float(lufs_entry.get()), "max_true_peak": float(peak_entry.get())}
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter numbers for the loudness target and peak ceiling.")
+            return
+
+    log_area.delete(1.0, tk.END)
+    cancel_event.clear()
+    convert_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    conversion_thread = threading.Thread(target=convert_wavs_to_mp3,
+                                         args=(folder, max_workers, cancel_event, recursive_var.get(), profiles,
+                                               normalization),
+                                         daemon=True)
+    conversion_thread.start()
+
+def on_cancel_click():
+    cancel_event.set()
+    log_message("Cancelling: waiting for running encodes to finish...")
+
+def finish_conversion():
+    global conversion_thread
+    conversion_thread = None
+    convert_button.config(state=tk.NORMAL)
+    cancel_button.config(state=tk.DISABLED)
 
 # GUI Setup
 root = tk.Tk()
@@ -74,11 +481,54 @@ folder_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
 browse_button = tk.Button(entry_frame, text="Browse", command=browse_folder)
 browse_button.pack(side=tk.RIGHT, padx=(5, 0))
 
-convert_button = tk.Button(root, text="Convert to MP3", command=on_convert_click)
-convert_button.pack(pady=10)
+options_frame = tk.Frame(root)
+options_frame.pack(pady=(5, 0))
+
+tk.Label(options_frame, text="Parallel encodes:").pack(side=tk.LEFT)
+workers_spinbox = tk.Spinbox(options_frame, from_=1, to=max(1, os.cpu_count() or 1), width=4)
+workers_spinbox.delete(0, tk.END)
+workers_spinbox.insert(0, str(DEFAULT_WORKERS))
+workers_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+
+recursive_var = tk.BooleanVar(value=False)
+tk.Checkbutton(options_frame, text="Include subfolders (skip up-to-date files)",
+               variable=recursive_var).pack(side=tk.LEFT, padx=(10, 0))
+
+profiles_frame = tk.Frame(root)
+profiles_frame.pack(pady=(5, 0))
+
+tk.Label(profiles_frame, text="Delivery profiles:").pack(side=tk.LEFT)
+profile_vars = {}
+for profile_name in DELIVERY_PROFILES:
+    profile_vars[profile_name] = tk.BooleanVar(value=profile_name in DEFAULT_PROFILES)
+    tk.Checkbutton(profiles_frame, text=profile_name, variable=profile_vars[profile_name]).pack(side=tk.LEFT)
+
+normalize_frame = tk.Frame(root)
+normalize_frame.pack(pady=(5, 0))
+
+normalize_var = tk.BooleanVar(value=False)
+tk.Checkbutton(normalize_frame, text="Normalize loudness to", variable=normalize_var).pack(side=tk.LEFT)
+lufs_entry = tk.Entry(normalize_frame, width=6)
+lufs_entry.insert(0, "-16")
+lufs_entry.pack(side=tk.LEFT)
+tk.Label(normalize_frame, text="LUFS, peak ceiling").pack(side=tk.LEFT, padx=(5, 0))
+peak_entry = tk.Entry(normalize_frame, width=6)
+peak_entry.insert(0, "-1")
+peak_entry.pack(side=tk.LEFT, padx=(5, 0))
+tk.Label(normalize_frame, text="dBTP").pack(side=tk.LEFT, padx=(5, 0))
+
+button_frame = tk.Frame(root)
+button_frame.pack(pady=10)
+
+convert_button = tk.Button(button_frame, text="Convert", command=on_convert_click)
+convert_button.pack(side=tk.LEFT, padx=5)
+
+cancel_button = tk.Button(button_frame, text="Cancel", command=on_cancel_click, state=tk.DISABLED)
+cancel_button.pack(side=tk.LEFT, padx=5)
 
 # Log/Output area
 log_area = scrolledtext.ScrolledText(root, width=70, height=15, wrap=tk.WORD)
 log_area.pack(padx=10, pady=(0, 10))
 
+root.after(100, drain_log_queue)
 root.mainloop()
\ No newline at end of file
@@ -3,11 +3,101 @@ file_deleter.py
 
 Controlled cleanup utility driven by explicit mapping rules. Intended for
 removing known-unwanted files in bulk. Review mappings carefully before running.
+
+The patterns in custom_map.txt are compiled once into a single regular
+expression shaped like a prefix trie, so each file name is checked in one pass
+however many patterns there are. Matches are collected from a recursive
+os.scandir walk into a deletion plan that is shown (and can be exported) for
+review before anything is removed. By default matches are moved into a
+quarantine batch inside the folder (see common/quarantine.py), which can be
+restored or purged later; long operations run in the background.
 """
 
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, scrolledtext
+import csv
 import os
+import queue
+import re
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.quarantine import (QUARANTINE_DIR, list_batches, plan_quarantine, purge_batches,
+                               quarantine_files, remove_files, restore_batch)
+from common.tree_walk import scan_dir, walk_tree
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a")
+
+# Largest number of plan lines shown in the window; the summary always covers the whole plan
+PREVIEW_LINES = 2000
+
+# Trie key marking the end of a pattern (never a single character, so it cannot collide
+# with a child key)
+TRIE_END = ""
+
+
+# Function to read the non-blank patterns from a mapping file
+def load_patterns(map_file_path):
+    with open(map_file_path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+# Function to turn a pattern trie into a regular expression. Shared prefixes are written
+# once, so the regex engine follows a single path per start position instead of trying
+# every pattern in turn.
+def _trie_regex(node):
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items())
+                if char != TRIE_END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if TRIE_END in node:
+        # A pattern ends here; the optional group still prefers the longer patterns
+        return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+    return body
+
+
+# Function to compile the patterns into one regex that finds any of them as a substring
+def compile_patterns(patterns):
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[TRIE_END] = True
+    return re.compile(_trie_regex(trie))
+
+
+# Function to list the audio files matching the compiled patterns, as (path, matched
+# pattern) sorted by path. With recursive, every folder below the root is walked (except
+# the quarantine folder).
+def plan_deletions(folder_path, matcher, recursive=True):
+    if recursive:
+        listings = walk_tree(folder_path, skip_dir=lambda path, name: name == QUARANTINE_DIR)
+    else:
+        listings = {folder_path: scan_dir(folder_path)}
+    plan = []
+    errors = []
+    for directory, listing in listings.items():
+        if listing.error:
+            errors.append((directory, listing.error))
+        for filename in listing.files:
+            if filename.lower().endswith(AUDIO_EXTENSIONS):
+                match = matcher.search(filename)
+                if match:
+                    plan.append((os.path.join(directory, filename), match.group()))
+    plan.sort()
+    return plan, errors
+
+
+# Function to write a deletion plan as CSV for review outside the app
+def write_plan_csv(csv_path, plan):
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "Matched Pattern"])
+        writer.writerows(plan)
+
 
 class AudioFileDeleterApp:
     def __init__(self, master):
@@ -16,6 +106,14 @@ class AudioFileDeleterApp:
 
         # Store the selected directory path
         self.selected_directory = tk.StringVar()
+        self.include_subfolders = tk.BooleanVar(value=True)
+        self.use_quarantine = tk.BooleanVar(value=True)
+
+        # The reviewed plan, and the folder/options it was built for
+        self.plan = None
+        self.plan_key = None
+        self.task_queue = queue.Queue()
+        self.busy = False
 
         # Create GUI elements
         self.create_widgets()
@@ -29,21 +127,38 @@ class AudioFileDeleterApp:
         browse_button = tk.Button(self.master, text="Browse...", command=self.browse_folder)
         browse_button.grid(row=0, column=2, padx=5, pady=5, sticky="w")
 
-        # Delete Button
-        delete_button = tk.Button(self.master, text="Delete Files", command=self.delete_files)
-        delete_button.grid(row=1, column=1, pady=10, sticky="n")
+        option_frame = tk.Frame(self.master)
+        option_frame.grid(row=1, column=1, padx=5, sticky="w")
+        tk.Checkbutton(option_frame, text="Include subfolders", variable=self.include_subfolders).pack(side=tk.LEFT)
+        tk.Checkbutton(option_frame, text="Move to quarantine instead of deleting",
+                       variable=self.use_quarantine).pack(side=tk.LEFT, padx=10)
+
+        # Find, Export and Delete Buttons
+        button_frame = tk.Frame(self.master)
+        button_frame.grid(row=2, column=0, columnspan=3, pady=10)
+        tk.Button(button_frame, text="Find Matches", command=self.find_matches).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Export Plan...", command=self.export_plan).pack(side=tk.LEFT, padx=5)
+        delete_button = tk.Button(button_frame, text="Delete Files", command=self.delete_files)
+        delete_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Restore Last Batch", command=self.restore_last).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Purge Quarantine", command=self.purge_quarantine).pack(side=tk.LEFT, padx=5)
+
+        # Plan / log output
+        self.log_output = scrolledtext.ScrolledText(self.master, width=90, height=25)
+        self.log_output.grid(row=3, column=0, columnspan=3, padx=5, pady=5)
 
     def browse_folder(self):
         folder_path = filedialog.askdirectory()
         if folder_path:
             self.selected_directory.set(folder_path)
 
-    def delete_files(self):
+    # Function to get the selected folder, or None (after telling the user) when it is invalid
+    def get_folder(self):
         # 1. Get the raw folder path from our StringVar
         raw_path = self.selected_directory.get().strip()
         if not raw_path:
             messagebox.showwarning("No Folder Selected", "Please select a folder first.")
-            return
+            return None
 
         # 2. Sanitize the path to remove surrounding quotes and normalize
         sanitized_path = raw_path.strip('"')  # remove extraneous quotes
@@ -52,45 +167,187 @@ class AudioFileDeleterApp:
         # Check that the directory actually exists
         if not os.path.isdir(folder_path):
             messagebox.showerror("Invalid Folder", f"The folder '{folder_path}' does not exist or is invalid.")
-            return
+            return None
+        return folder_path
 
-        # 3. Build path to custom_map.txt
+    # Function to load and compile custom_map.txt, or None (after telling the user)
+    def get_matcher(self):
+        # Build path to custom_map.txt
         script_dir = os.path.dirname(os.path.abspath(__file__))
         map_file_path = os.path.join(script_dir, "mappings", "custom_map.txt")
 
         if not os.path.exists(map_file_path):
             messagebox.showerror("File Not Found", f"The file {map_file_path} does not exist.")
-            return
-
-        # 4. Read lines from custom_map.txt
-        with open(map_file_path, "r", encoding="utf-8") as f:
-            patterns = [line.strip() for line in f if line.strip()]
+            return None
 
+        patterns = load_patterns(map_file_path)
         if not patterns:
             messagebox.showinfo("No Patterns", "No patterns found in custom_map.txt.")
+            return None
+        return compile_patterns(patterns), len(patterns)
+
+    # Function to run work off the GUI thread; on_done(result) is called on the GUI thread
+    # with the return value (or the exception raised). One task runs at a time.
+    def run_task(self, message, work, on_done):
+        if self.busy:
+            messagebox.showinfo("Busy", "Please wait for the current operation to finish.")
             return
+        self.busy = True
+        self.log_output.insert(tk.END, message + "\n")
+        self.log_output.see(tk.END)
+
+        def worker():
+            try:
+                self.task_queue.put((on_done, work()))
+            except Exception as e:
+                self.task_queue.put((on_done, e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.master.after(100, self.poll_task)
+
+    def poll_task(self):
+        try:
+            on_done, result = self.task_queue.get_nowait()
+        except queue.Empty:
+            self.master.after(100, self.poll_task)
+            return
+        self.busy = False
+        if isinstance(result, Exception):
+            self.log_output.insert(tk.END, f"Error: {result}\n")
+            self.log_output.see(tk.END)
+            return
+        on_done(result)
+
+    # Function to build the deletion plan in the background and show it for review
+    def find_matches(self):
+        folder_path = self.get_folder()
+        if folder_path is None:
+            return
+        loaded = self.get_matcher()
+        if loaded is None:
+            return
+        matcher, pattern_count = loaded
+        recursive = self.include_subfolders.get()
+
+        def on_done(result):
+            self.plan, errors = result
+            self.plan_key = (folder_path, recursive)
+            self.show_plan(errors)
+
+        self.plan = None
+        self.log_output.delete(1.0, tk.END)
+        self.run_task(f"Scanning {folder_path} for {pattern_count} patterns...",
+                      lambda: plan_deletions(folder_path, matcher, recursive), on_done)
+
+    # Function to show the plan as one block of text (capped at PREVIEW_LINES)
+    def show_plan(self, errors):
+        folder_path = self.plan_key[0]
+        lines = [f"Delete: {os.path.relpath(path, folder_path)}  [{pattern}]" for path, pattern in self.plan]
+        if len(lines) > PREVIEW_LINES:
+            lines = lines[:PREVIEW_LINES] + [f"... and {len(lines) - PREVIEW_LINES} more (use Export Plan to see all)"]
+        lines.extend(f"Could not read {path}: {error}" for path, error in errors)
+        lines.append(f"\nPlan: {len(self.plan)} files to delete. Review it, then press Delete Files.")
+        self.log_output.insert(tk.END, "\n".join(lines) + "\n")
+        self.log_output.see(tk.END)
+
+    def export_plan(self):
+        if self.plan is None:
+            messagebox.showinfo("No Plan", "Press Find Matches first.")
+            return
+        csv_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if csv_path:
+            write_plan_csv(csv_path, self.plan)
+            self.log_output.insert(tk.END, f"Plan exported to {csv_path}\n")
+
+    # Function to delete (or quarantine) the files in the reviewed plan
+    def delete_files(self):
+        folder_path = self.get_folder()
+        if folder_path is None:
+            return
+        if self.plan is None or self.plan_key != (folder_path, self.include_subfolders.get()):
+            messagebox.showinfo("Review First",
+                                "Press Find Matches and review the plan for this folder before deleting.")
+            return
+        if not self.plan:
+            messagebox.showinfo("Nothing to Delete", "The plan has no files.")
+            return
+        paths = [file_path for file_path, _ in self.plan]
+
+        if self.use_quarantine.get():
+            if not messagebox.askyesno("Confirm Quarantine",
+                                       f"Move the {len(paths)} files in the plan to quarantine?"):
+                return
+
+            def work():
+                plan = plan_quarantine(folder_path, paths)
+                return quarantine_files(folder_path, plan), len(plan.steps), plan.skipped
+
+            def on_done(result):
+                batch_id, moved, skipped = result
+                lines = [f"Skipped '{item.src}': {item.reason}" for item in skipped]
+                lines.append(f"Moved {moved} files to quarantine batch {batch_id}. "
+                             "Use Restore Last Batch to undo, or Purge Quarantine to delete them.")
+                self.finish_delete(lines, f"Moved {moved} files to quarantine.")
+
+            self.run_task(f"Moving {len(paths)} files to quarantine...", work, on_done)
+        else:
+            if not messagebox.askyesno("Confirm Deletion",
+                                       f"Permanently delete the {len(paths)} files in the plan?"):
+                return
+
+            def on_done(result):
+                deleted_count, failures = result
+                self.finish_delete(failures + [f"Deleted {deleted_count} files."], f"Deleted {deleted_count} files.")
+
+            self.run_task(f"Deleting {len(paths)} files...", lambda: remove_files(paths), on_done)
+
+    def finish_delete(self, lines, summary):
+        self.plan = None
+        self.log_output.insert(tk.END, "\n".join(lines) + "\n")
+        self.log_output.see(tk.END)
+        messagebox.showinfo("Deletion Complete", summary)
+
+    # Function to move the newest quarantine batch back to where its files came from
+    def restore_last(self):
+        folder_path = self.get_folder()
+        if folder_path is None:
+            return
+        batches = list_batches(folder_path)
+        if not batches:
+            messagebox.showinfo("Nothing to Restore", "This folder has no quarantine batches.")
+            return
+        batch_id, count, _ = batches[-1]
+        if not messagebox.askyesno("Restore Files", f"Restore the {count} files of quarantine batch {batch_id}?"):
+            return
+
+        def on_done(result):
+            self.plan = None  # The folder changed, so the plan has to be rebuilt
+            self.log_output.insert(tk.END, f"Restored {result[1]} files from batch {result[0]}.\n")
+            self.log_output.see(tk.END)
+
+        self.run_task(f"Restoring batch {batch_id}...", lambda: restore_batch(folder_path, batch_id), on_done)
+
+    # Function to permanently delete every quarantined file in the folder
+    def purge_quarantine(self):
+        folder_path = self.get_folder()
+        if folder_path is None:
+            return
+        batches = list_batches(folder_path)
+        if not batches:
+            messagebox.showinfo("Nothing to Purge", "This folder has no quarantine batches.")
+            return
+        count = sum(files for _, files, _ in batches)
+        if not messagebox.askyesno("Purge Quarantine",
+                                   f"Permanently delete {count} quarantined files in {len(batches)} batches?"):
+            return
+
+        def on_done(result):
+            removed, errors = result
+            self.log_output.insert(tk.END, "\n".join(errors + [f"Purged {removed} quarantined files."]) + "\n")
+            self.log_output.see(tk.END)
 
-        # 5. Count of deleted files
-        deleted_count = 0
-
-        # 6. Iterate through files in the selected folder
-        for filename in os.listdir(folder_path):
-            # Optional: check common audio extensions
-            if filename.lower().endswith((".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a")):
-                file_path = os.path.join(folder_path, filename)
-
-                # Check if any of the patterns is a substring in the filename
-                for pattern in patterns:
-                    if pattern in filename:
-                        try:
-                            os.remove(file_path)
-                            deleted_count += 1
-                            print(f"Deleted file: {filename}")
-                        except Exception as e:
-                            print(f"Error deleting file '{filename}': {e}")
-                        break  # Stop checking other patterns once deleted
-
-        messagebox.showinfo("Deletion Complete", f"Deleted {deleted_count} files.")
+        batch_ids = [batch_id for batch_id, _, _ in batches]
+        self.run_task("Purging quarantine...", lambda: purge_batches(folder_path, batch_ids), on_done)
 
 def main():
     root = tk.Tk()
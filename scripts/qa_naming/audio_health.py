@@ -0,0 +1,214 @@
+"""
+audio_health.py
+
+Audio QA pass for the inventory checks. Confirms that clips are usable, not just
+present: reads each header directly, then measures peak, RMS, silence ratio and
+clipped samples with NumPy over memory-mapped PCM. Files are analyzed in a
+process pool, and results are cached per content hash so unchanged clips are
+never rescanned. Compressed formats get header checks only.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import audio_probe, pcm, wav_io
+from common.file_hash import file_sha256
+from common.result_cache import ResultCache
+
+CACHE_VERSION = 1
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac', '.m4a', '.aif', '.aiff', '.ogg')
+
+# Measurement settings
+FRAME_SECONDS = 0.05      # Silence is judged per 50 ms frame
+SILENCE_DB = -50.0        # Frames quieter than this (RMS, dBFS) count as silent
+CLIP_LEVEL = 0.999        # Samples at or above this magnitude count as clipped
+BLOCK_SECONDS = 30.0      # Samples converted to float at a time
+
+# Thresholds for reporting a problem
+MIN_DURATION = 0.1
+SILENT_RATIO = 0.98
+SILENT_PEAK_DB = -60.0
+
+
+# Function to convert a linear level to dBFS (None for digital silence)
+def to_db(value):
+    return round(20 * np.log10(value), 2) + 0.0 if value > 0 else None  # + 0.0 turns -0.0 into 0.0
+
+
+# Function to get how many bytes of sample data a WAV header promises but the file lacks
+def missing_data_bytes(path, info):
+    with open(path, 'rb') as f:
+        f.seek(info.data_offset - 4)
+        declared = struct.unpack('<I', f.read(4))[0]
+    # Streaming writers leave the size at 0 or 0xFFFFFFFF, which is not truncation
+    if declared in (0, 0xFFFFFFFF):
+        return 0
+    return max(0, declared - declared % info.block_align - info.data_size)
+
+
+# Function to measure an uncompressed WAV from a memory map, block by block
+def measure_pcm(path, info):
+    frame_length = max(1, int(round(FRAME_SECONDS * info.sample_rate)))
+    block_frames = max(1, int(BLOCK_SECONDS * info.sample_rate) // frame_length) * frame_length
+    peak = 0.0
+    square_sum = 0.0
+    clipped = 0
+    silent_frames = 0
+    total_frames = 0
+    if info.data_size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = memoryview(mapped)[info.data_offset:info.data_offset + info.data_size]
+            try:
+                block_bytes = block_frames * info.block_align
+                for start in range(0, len(data), block_bytes):
+                    samples = pcm.pcm_to_float(data[start:start + block_bytes], info)
+                    magnitude = np.abs(samples)
+                    peak = max(peak, float(magnitude.max()))
+                    clipped += int(np.count_nonzero(magnitude >= CLIP_LEVEL))
+                    power = np.square(samples, dtype=np.float64).mean(axis=1)
+                    square_sum += float(power.sum())
+                    whole = len(power) // frame_length * frame_length
+                    frames = power[:whole].reshape(-1, frame_length).mean(axis=1)
+                    if whole < len(power):
+                        frames = np.append(frames, power[whole:].mean())
+                    silent_frames += int(np.count_nonzero(frames < 10 ** (SILENCE_DB / 10)))
+                    total_frames += len(frames)
+            finally:
+                data.release()
+    return {
+        'peak_db': to_db(peak),
+        'rms_db': to_db(np.sqrt(square_sum / info.num_frames)) if info.num_frames else None,
+        'silence_ratio': round(silent_frames / total_frames, 4) if total_frames else 1.0,
+        'clipped_samples': clipped,
+    }
+
+
+# Function to analyze one file. Returns a JSON-serializable dict; problems reading the
+# file are reported in "error" rather than raised, so one bad clip cannot stop a scan.
+def analyze_clip(path):
+    result = {'codec': None, 'sample_rate': None, 'channels': None, 'duration': None,
+              'peak_db': None, 'rms_db': None, 'silence_ratio': None, 'clipped_samples': None,
+              'missing_bytes': 0, 'error': None}
+    try:
+        try:
+            info = wav_io.read_wav_info(path)
+        except ValueError:
+            info = None
+        if info is not None and info.is_uncompressed:
+            result.update(codec='pcm', sample_rate=info.sample_rate, channels=info.channels,
+                          duration=info.duration, missing_bytes=missing_data_bytes(path, info))
+            result.update(measure_pcm(path, info))
+        else:
+            probed = audio_probe.probe_audio_uncached(path)
+            result.update(codec=probed['codec'], sample_rate=probed['sample_rate'],
+                          channels=probed['channels'], duration=probed['duration'])
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+    return result
+
+
+# Function to list the problems in a result. expected_rate flags clips at another rate.
+def health_issues(result, expected_rate=None):
+    if result['error']:
+        return [f"unreadable: {result['error']}"]
+    issues = []
+    if result['missing_bytes']:
+        issues.append(f"truncated ({result['missing_bytes']} bytes of audio missing)")
+    if result['duration'] is not None and result['duration'] < MIN_DURATION:
+        issues.append(f"too short ({result['duration']:.3f}s)")
+    if result['silence_ratio'] is not None and (
+            result['silence_ratio'] >= SILENT_RATIO or result['peak_db'] is None or
+            result['peak_db'] < SILENT_PEAK_DB):
+        issues.append("silent")
+    if result['clipped_samples']:
+        issues.append(f"clipped ({result['clipped_samples']} samples)")
+    if expected_rate and result['sample_rate'] and result['sample_rate'] != expected_rate:
+        issues.append(f"sample rate {result['sample_rate']} Hz (expected {expected_rate} Hz)")
+    return issues
+
+
+# Function to find the sample rate most clips share, used as the expected rate
+def common_sample_rate(results):
+    rates = Counter(result['sample_rate'] for result in results.values() if result['sample_rate'])
+    return rates.most_common(1)[0][0] if rates else None
+
+
+# Function to list the audio files directly inside the given folders
+def audio_files_in(folders):
+    paths = []
+    for folder in folders:
+        try:
+            with os.scandir(folder) as entries:
+                paths.extend(entry.path for entry in entries
+                             if entry.name.lower().endswith(AUDIO_EXTENSIONS) and entry.is_file())
+        except OSError:
+            continue
+    return sorted(paths)
+
+
+# Function to open the shared per-user health cache
+def default_cache():
+    return ResultCache(os.path.join(audio_probe.cache_dir(), 'health_cache.json'), CACHE_VERSION)
+
+
+# Function to analyze many files. Unchanged files are looked up by content hash; the
+# rest are hashed on a thread pool and analyzed on a process pool. Returns
+# {path: result}; progress(done, total) is called as analyses finish.
+def scan_health(paths, max_workers=None, cache=None, progress=None):
+    cache = cache or default_cache()
+    digests = {}
+    to_hash = []
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            digests[path] = None
+            continue
+        digest = cache.known_hash(os.path.abspath(path), stat_result)
+        if digest is None:
+            to_hash.append((path, stat_result))
+        else:
+            digests[path] = digest
+
+    # Hashing is I/O bound and hashlib releases the GIL, so threads are enough
+    def hash_one(item):
+        path, stat_result = item
+        try:
+            digest = file_sha256(path)
+        except OSError:
+            return path, None
+        cache.record_hash(os.path.abspath(path), stat_result, digest)
+        return path, digest
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        digests.update(executor.map(hash_one, to_hash))
+
+    results = {}
+    pending = []
+    for path in paths:
+        cached = cache.get(digests[path]) if digests.get(path) else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending.append(path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunksize = max(1, len(pending) // ((max_workers or os.cpu_count() or 1) * 8))
+            for done, (path, result) in enumerate(zip(pending, executor.map(analyze_clip, pending,
+                                                                            chunksize=chunksize)), 1):
+                results[path] = result
+                if digests.get(path) and not result['error']:
+                    cache.put(digests[path], result)
+                if progress:
+                    progress(done, len(pending))
+    cache.save()
+    return results
@@ -0,0 +1,343 @@
+"""
+inventory.py
+
+Inventory rules shared by namecheckauto.py and inventory_report.py: the mapping
+sets, how clip names are keyed, one-shot and deep-tree inventories, comparison
+against the references, auto-selection of the best mapping combination, and the
+polling watcher. Has no GUI dependencies, so headless tools can import it.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+from near_match import suggest_renames
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tree_walk import scan_dir
+
+# Mapping files behind each mapping type, in the mappings folder next to this script
+MAPPING_TYPES = ["Names", "Ordinal (Numbers)", "Cardinal (Numbers)"]
+MAPPING_FILES = {
+    "Names": ["1-SYL.txt", "2-SYL_001.txt", "2-SYL_002.txt",
+              "2-SYL_003.txt", "2-SYL_004.txt", "3-SYL.txt", "4-SYL.txt"],
+    "Ordinal (Numbers)": [f"{i}_NUM_ORD.txt" for i in range(1, 5)],
+    "Cardinal (Numbers)": [f"{i}_NUM_CAR.txt" for i in range(1, 5)],
+}
+
+# Combinations tried by auto-analysis ("Ordinal (Numbers)" and "Cardinal (Numbers)" never together)
+POSSIBLE_COMBINATIONS = [
+    ("Names",),
+    ("Ordinal (Numbers)",),
+    ("Cardinal (Numbers)",),
+    ("Names", "Ordinal (Numbers)"),
+    ("Names", "Cardinal (Numbers)"),
+]
+
+# Function to get the name a clip is checked under: everything from the first
+# underscore, without the extension ("12_Alice.wav" -> "_Alice")
+def clip_key(file_name):
+    return os.path.splitext(file_name[file_name.find('_'):])[0]
+
+# Function to read every mapping type once. Returns ({mapping type: {reference key: set of
+# expected names}}, {mapping type: error}); a type with a missing file is left out.
+def load_mapping_index(mapping_dir=None):
+    if mapping_dir is None:
+        mapping_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mappings")
+    if not os.path.exists(mapping_dir):
+        error = f"Mapping directory '{mapping_dir}' not found!"
+        return {}, {mapping_type: error for mapping_type in MAPPING_TYPES}
+
+    mappings = {}
+    errors = {}
+    for mapping_type, file_names in MAPPING_FILES.items():
+        references = {}
+        for file_name in file_names:
+            file_path = os.path.join(mapping_dir, file_name)
+            if not os.path.exists(file_path):
+                errors[mapping_type] = f"Reference file {file_name} not found!"
+                break
+            ref_key = file_name.split(".")[0]
+            if "NUM" in ref_key:
+                ref_key = f"{ref_key.split('_')[0]}-SYL_NUM"
+            with open(file_path, "r") as f:
+                references.setdefault(ref_key, set()).update(
+                    os.path.splitext(line.strip())[0] for line in f if line.strip() and "REMOVE" not in line
+                )
+        else:
+            mappings[mapping_type] = references
+    return mappings, errors
+
+# Function to merge the references of several mapping types from a loaded mapping index
+def combine_references(mappings, mapping_types):
+    references = {}
+    for mapping_type in mapping_types:
+        for ref_key, names in mappings[mapping_type].items():
+            references.setdefault(ref_key, set()).update(names)
+    return references
+
+class InventoryIndex:
+    """Clip names found on disk, from a single scan of the root folder and its subfolders.
+
+    root_files holds the clip keys of files directly in the root; subfolders maps each
+    subfolder name (stripped) to (folder name, set of clip keys, error or None).
+    """
+
+    def __init__(self, root_folder, root_files, subfolders):
+        self.root_folder = root_folder
+        self.root_files = root_files
+        self.subfolders = subfolders
+
+    @property
+    def is_single_folder(self):
+        return not self.subfolders
+
+    # Function to get the clip keys to check a reference against in an analysis mode.
+    # Returns (actual keys or None, problem message or None).
+    def actual_files(self, mode, ref_key):
+        if mode == "Root Folder":
+            return self.root_files, None
+        subfolder = self.subfolders.get(ref_key)
+        if subfolder is None:
+            return None, f"Missing subfolder for: {ref_key}"
+        folder_name, keys, error = subfolder
+        if error:
+            return None, f"Error reading subfolder {ref_key}: {error}"
+        return keys, None
+
+    # Function to get the folder a reference is checked in (None for a missing subfolder)
+    def folder_path(self, mode, ref_key):
+        if mode == "Root Folder":
+            return self.root_folder
+        subfolder = self.subfolders.get(ref_key)
+        return os.path.join(self.root_folder, subfolder[0]) if subfolder else None
+
+# Function to scan a root folder once into an InventoryIndex. Raises OSError when the
+# root itself cannot be read; unreadable subfolders are recorded in the index.
+def scan_inventory(root_folder):
+    root_files = set()
+    subfolders = {}
+    with os.scandir(root_folder) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                subfolders[entry.name.strip()] = entry.name
+            elif '_' in entry.name and entry.is_file():
+                root_files.add(clip_key(entry.name))
+
+    for key, folder_name in subfolders.items():
+        try:
+            with os.scandir(os.path.join(root_folder, folder_name)) as entries:
+                keys = {clip_key(entry.name) for entry in entries if '_' in entry.name}
+            subfolders[key] = (folder_name, keys, None)
+        except OSError as e:
+            subfolders[key] = (folder_name, set(), e)
+    return InventoryIndex(root_folder, root_files, subfolders)
+
+# Function to split a deep tree walk (common.tree_walk listings) into inventories. A folder
+# holding subfolders named after references is checked in "Subfolders" mode; any other
+# folder holding clips (outside a reference folder) is checked in "Root Folder" mode.
+# Returns a sorted list of (InventoryIndex, mode).
+def inventories_from_walk(listings, reference_keys):
+    inventories = []
+    for path, listing in sorted(listings.items()):
+        if listing.error:
+            continue
+        root_files = {clip_key(name) for name in listing.files if '_' in name}
+        subfolders = {}
+        for name in listing.dirs:
+            if name.strip() not in reference_keys:
+                continue
+            child = listings.get(os.path.join(path, name))
+            if child is not None:
+                keys = {clip_key(file_name) for file_name in child.files if '_' in file_name}
+                subfolders[name.strip()] = (name, keys, child.error)
+        if subfolders:
+            inventories.append((InventoryIndex(path, root_files, subfolders), "Subfolders"))
+        elif root_files and os.path.basename(path).strip() not in reference_keys:
+            inventories.append((InventoryIndex(path, root_files, {}), "Root Folder"))
+    return inventories
+
+# Function to compare references against an inventory in one analysis mode. Returns one
+# dict per reference: "reference", "folder" (path checked), "problem" (message when the
+# folder is missing or unreadable, else None), "expected" (count) and sorted "present",
+# "missing" and "unexpected" names, plus near-miss rename "suggestions". In "Root Folder"
+# mode every reference shares the same unexpected names.
+def compare_inventory(references, inventory, mode):
+    report = []
+    for ref_key, expected_files in references.items():
+        actual_files, problem = inventory.actual_files(mode, ref_key)
+        result = {"reference": ref_key, "folder": inventory.folder_path(mode, ref_key), "problem": problem,
+                  "expected": len(expected_files), "present": [], "missing": [], "unexpected": [],
+                  "suggestions": []}
+        if actual_files is not None:
+            missing_files = expected_files - actual_files
+            result.update(present=sorted(expected_files & actual_files), missing=sorted(missing_files))
+            if mode != "Root Folder":
+                unexpected_files = actual_files - expected_files
+                result.update(unexpected=sorted(unexpected_files),
+                              suggestions=suggest_renames(missing_files, unexpected_files))
+        report.append(result)
+
+    if mode == "Root Folder" and report:
+        # Every reference is checked against the same files, so strays (names no reference
+        # expects) are matched once against everything missing, then filed under the
+        # reference each suggested name belongs to
+        all_expected = set().union(*references.values())
+        unexpected_files = inventory.root_files - all_expected
+        all_missing = set().union(*(result["missing"] for result in report))
+        owner = {name: result for result in report for name in result["missing"]}
+        for suggestion in suggest_renames(all_missing, unexpected_files):
+            owner[suggestion[1]]["suggestions"].append(suggestion)
+        for result in report:
+            result["unexpected"] = sorted(unexpected_files)
+    return report
+
+# Function to score a set of references against an inventory for auto-analysis.
+# Returns (matching names, missing names); a missing subfolder counts all of its names.
+def score_references(references, inventory, mode):
+    match_count = 0
+    total_missing_files = 0
+    for ref_key, expected_files in references.items():
+        actual_files, problem = inventory.actual_files(mode, ref_key)
+        if actual_files is None:
+            if problem.startswith("Missing subfolder"):
+                total_missing_files += len(expected_files)
+            continue
+        matches = len(expected_files & actual_files)
+        match_count += matches
+        total_missing_files += len(expected_files) - matches
+    return match_count, total_missing_files
+
+# Function to pick the best mapping combination for an inventory: most matches, then
+# fewest missing files. Returns (combination, matches, missing) or None.
+def best_mapping_for(mappings, inventory, mode, log=print):
+    best = None
+    for mapping_comb in POSSIBLE_COMBINATIONS:
+        if not all(mapping_type in mappings for mapping_type in mapping_comb):
+            log(f"No references found for combination: {mapping_comb}")
+            continue
+        references = combine_references(mappings, mapping_comb)
+        match_count, total_missing_files = score_references(references, inventory, mode)
+        log(f"Matches for combination {mapping_comb}: {match_count}, Missing files: {total_missing_files}")
+        if match_count > 0 and (best is None or match_count > best[1] or
+                                (match_count == best[1] and total_missing_files < best[2])):
+            best = (mapping_comb, match_count, total_missing_files)
+    return best
+
+class InventoryWatcher:
+    """Live inventory of one root folder, kept current by polling.
+
+    Holds a snapshot of the watched folders (the root, plus the reference subfolders
+    in "Subfolders" mode). Each poll stats those folders and relists only the ones
+    whose mtime changed; the clip names that appeared or disappeared then update
+    the present counts directly, so nothing is recompared from scratch.
+    """
+
+    # A folder listed this soon after its last change is listed again on the next poll,
+    # since filesystems with coarse timestamps can hide a later change in the same tick
+    RACY_SECONDS = 2.0
+
+    def __init__(self, root_folder, references, mode):
+        self.root_folder = root_folder
+        self.references = references
+        self.mode = mode
+        # Which references expect each name, for updating counts from a single name
+        self.name_refs = {}
+        for ref_key, expected_files in references.items():
+            for name in expected_files:
+                self.name_refs.setdefault(name, []).append(ref_key)
+        self.listings = {}     # Folder path -> DirListing at the last poll
+        self.read_times = {}   # Folder path -> time.time() of that listing
+        self.key_counts = {}   # Folder path -> Counter of clip keys (several files may share a key)
+        self.folder_refs = {}  # Folder path -> reference keys checked in it
+        self.present = {ref_key: set() for ref_key in references}
+        listing = self._read(root_folder)
+        if listing.error:
+            raise listing.error
+        self._update_subfolders(listing)
+
+    # Function to list a folder and record it in the snapshot
+    def _read(self, path):
+        self.read_times[path] = time.time()
+        listing = scan_dir(path)
+        self.listings[path] = listing
+        return listing
+
+    # Function to check whether a folder may have changed since it was listed
+    def _stale(self, path):
+        listing = self.listings[path]
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return True
+        return (mtime_ns != listing.mtime_ns or
+                self.read_times[path] - mtime_ns / 1e9 < self.RACY_SECONDS)
+
+    # Function to start or stop tracking reference subfolders after the root changed
+    def _update_subfolders(self, root_listing):
+        changes = []
+        if self.mode == "Root Folder":
+            self.folder_refs[self.root_folder] = list(self.references)
+            changes.extend(self._apply(self.root_folder, root_listing))
+            return changes
+        wanted = {os.path.join(self.root_folder, name): name.strip()
+                  for name in root_listing.dirs if name.strip() in self.references}
+        for path in [path for path in self.folder_refs if path not in wanted]:
+            changes.extend(self._apply(path, None))
+            del self.folder_refs[path]
+            self.listings.pop(path, None)
+            self.read_times.pop(path, None)
+        for path, ref_key in wanted.items():
+            if path not in self.folder_refs:
+                self.folder_refs[path] = [ref_key]
+                changes.extend(self._apply(path, self._read(path)))
+        return changes
+
+    # Function to replace a folder's clip keys with those of a new listing (None when the
+    # folder is gone) and apply the difference to the present sets. Returns the changes
+    # as (reference, name, "added" or "removed").
+    def _apply(self, path, listing):
+        old_counts = self.key_counts.get(path, Counter())
+        new_counts = Counter(clip_key(name) for name in listing.files if '_' in name) \
+            if listing is not None and not listing.error else Counter()
+        if self.mode == "Subfolders" and listing is not None:
+            # Subfolder listings count every entry, as the one-shot check does
+            new_counts.update(clip_key(name) for name in listing.dirs if '_' in name)
+        self.key_counts[path] = new_counts
+        refs_here = set(self.folder_refs.get(path, ()))
+        changes = []
+        for name in new_counts.keys() - old_counts.keys():
+            for ref_key in self.name_refs.get(name, ()):
+                if ref_key in refs_here:
+                    self.present[ref_key].add(name)
+                    changes.append((ref_key, name, "added"))
+        for name in old_counts.keys() - new_counts.keys():
+            for ref_key in self.name_refs.get(name, ()):
+                if ref_key in refs_here:
+                    self.present[ref_key].discard(name)
+                    changes.append((ref_key, name, "removed"))
+        return changes
+
+    # Function to pick up changes since the last poll. Returns the list of changes.
+    def poll(self):
+        changes = []
+        if self._stale(self.root_folder):
+            changes.extend(self._update_subfolders(self._read(self.root_folder)))
+        if self.mode == "Subfolders":
+            for path in list(self.folder_refs):
+                if path in self.listings and self._stale(path):
+                    changes.extend(self._apply(path, self._read(path)))
+        return changes
+
+    # Function to get the live counts: {reference: (present, expected, folder found)}
+    def counts(self):
+        found = {ref_key for refs in self.folder_refs.values() for ref_key in refs}
+        return {ref_key: (len(self.present[ref_key]), len(expected_files), ref_key in found)
+                for ref_key, expected_files in self.references.items()}
+
+    # Function to get overall (present, expected, missing) counts
+    def totals(self):
+        present = sum(len(names) for names in self.present.values())
+        expected = sum(len(names) for names in self.references.values())
+        return present, expected, expected - present
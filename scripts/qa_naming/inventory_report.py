@@ -0,0 +1,225 @@
+"""
+inventory_report.py
+
+Headless inventory check for whole deliveries. Walks a project tree of any depth
+with a parallel os.scandir walker, checks every folder of clips against the
+mapping sets (the rules in inventory.py, shared with namecheckauto.py) and
+writes JSON and/or CSV reports with counts and the missing and unexpected
+names. With --health every clip is also checked for truncation, silence,
+clipping and sample rate. Exits with status 1 when anything is missing or
+unhealthy, so it can gate batch jobs. Needs no GUI libraries.
+
+Usage:
+    python inventory_report.py /path/to/show --json report.json --csv report.csv
+    python inventory_report.py /path/to/show --types names ordinal --health
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from inventory import (MAPPING_TYPES, best_mapping_for, combine_references, compare_inventory,
+                       inventories_from_walk, load_mapping_index)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tree_walk import DEFAULT_WORKERS, walk_tree
+
+# Command-line spellings of the mapping types
+TYPE_ALIASES = {
+    "names": "Names",
+    "ordinal": "Ordinal (Numbers)",
+    "cardinal": "Cardinal (Numbers)",
+}
+
+CSV_FIELDS = ["folder", "mapping_types", "reference", "status", "name", "suggested_name", "detail"]
+
+
+# Function to check one inventory. Uses mapping_types when given, otherwise the best
+# scoring combination; returns a report dict, or None when no combination matches.
+def check_inventory(inventory, mode, mappings, mapping_types=None):
+    if mapping_types is None:
+        best = best_mapping_for(mappings, inventory, mode, log=lambda message: None)
+        if best is None:
+            return None
+        mapping_types = best[0]
+    references = combine_references(mappings, mapping_types)
+    results = compare_inventory(references, inventory, mode)
+    if not any(result["present"] for result in results):
+        return None
+    # In "Root Folder" mode the unexpected names belong to the folder, not to each reference
+    shared_unexpected = results[0]["unexpected"] if mode == "Root Folder" else []
+    return {
+        "folder": inventory.root_folder,
+        "mode": mode,
+        "mapping_types": list(mapping_types),
+        "unexpected": shared_unexpected,
+        "references": [
+            {
+                "reference": result["reference"],
+                "folder": result["folder"],
+                "problem": result["problem"],
+                "expected": result["expected"],
+                "present": len(result["present"]),
+                "missing": result["missing"],
+                "unexpected": [] if mode == "Root Folder" else result["unexpected"],
+                "suggested_renames": [{"present": present, "correct": correct, "distance": distance}
+                                      for present, correct, distance in result["suggestions"]],
+            }
+            for result in results
+        ],
+    }
+
+
+# Function to run the audio health scan over the clips of every checked folder and attach
+# each folder's problem files to its report. Returns the number of files with problems.
+def add_health(folders, listings, max_workers=None):
+    import audio_health  # Needs NumPy, which is only required for the health scan
+
+    folder_files = {}
+    for folder_report in folders:
+        if folder_report["mode"] == "Root Folder":
+            clip_folders = [folder_report["folder"]]
+        else:
+            clip_folders = [result["folder"] for result in folder_report["references"] if result["folder"]]
+        folder_files[folder_report["folder"]] = [
+            os.path.join(path, name) for path in clip_folders for name in sorted(listings[path].files)
+            if name.lower().endswith(audio_health.AUDIO_EXTENSIONS)]
+    paths = [path for files in folder_files.values() for path in files]
+    results = audio_health.scan_health(paths, max_workers=max_workers)
+    expected_rate = audio_health.common_sample_rate(results)
+
+    problem_count = 0
+    for folder_report in folders:
+        problems = []
+        for path in folder_files[folder_report["folder"]]:
+            issues = audio_health.health_issues(results[path], expected_rate)
+            if issues:
+                problems.append(dict(results[path], file=path, issues=issues))
+        folder_report["health"] = {"files_checked": len(folder_files[folder_report["folder"]]),
+                                   "expected_sample_rate": expected_rate, "problems": problems}
+        problem_count += len(problems)
+    return problem_count
+
+
+# Function to build the full report for a tree
+def build_report(root_folder, mappings, mapping_types=None, max_workers=DEFAULT_WORKERS, health=False):
+    started = time.monotonic()
+    reference_keys = set()
+    for references in mappings.values():
+        reference_keys.update(references)
+    listings = walk_tree(root_folder, max_workers=max_workers)
+
+    folders = []
+    skipped = 0
+    for inventory, mode in inventories_from_walk(listings, reference_keys):
+        folder_report = check_inventory(inventory, mode, mappings, mapping_types)
+        if folder_report is None:
+            skipped += 1
+        else:
+            folders.append(folder_report)
+
+    summary = {"folders_scanned": len(listings), "folders_checked": len(folders),
+               "folders_without_matches": skipped, "expected": 0, "present": 0, "missing": 0,
+               "unexpected": 0, "missing_folders": 0, "suggested_renames": 0}
+    for folder_report in folders:
+        summary["unexpected"] += len(folder_report["unexpected"])
+        for result in folder_report["references"]:
+            if result["problem"]:
+                summary["missing_folders"] += 1
+            summary["expected"] += result["expected"]
+            summary["present"] += result["present"]
+            summary["missing"] += len(result["missing"]) if not result["problem"] else result["expected"]
+            summary["unexpected"] += len(result["unexpected"])
+            summary["suggested_renames"] += len(result["suggested_renames"])
+    if health:
+        summary["health_problems"] = add_health(folders, listings, max_workers)
+
+    return {
+        "root": os.path.abspath(root_folder),
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(time.monotonic() - started, 3),
+        "unreadable_folders": {path: str(listing.error) for path, listing in listings.items() if listing.error},
+        "summary": summary,
+        "folders": folders,
+    }
+
+
+# Function to write the report as one CSV row per missing, unexpected or problem entry
+def write_csv_report(csv_path, report):
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for folder_report in report["folders"]:
+            mapping_types = "; ".join(folder_report["mapping_types"])
+            renames = {rename["present"]: rename["correct"] for result in folder_report["references"]
+                       for rename in result["suggested_renames"]}
+            for problem in folder_report.get("health", {}).get("problems", []):
+                writer.writerow({"folder": os.path.dirname(problem["file"]), "mapping_types": mapping_types,
+                                 "reference": "", "status": "health", "name": os.path.basename(problem["file"]),
+                                 "suggested_name": "", "detail": "; ".join(problem["issues"])})
+            for name in folder_report["unexpected"]:
+                writer.writerow({"folder": folder_report["folder"], "mapping_types": mapping_types, "reference": "",
+                                 "status": "unexpected", "name": name, "suggested_name": renames.get(name, ""),
+                                 "detail": ""})
+            for result in folder_report["references"]:
+                row = {"folder": result["folder"] or folder_report["folder"], "mapping_types": mapping_types,
+                       "reference": result["reference"], "suggested_name": "", "detail": ""}
+                if result["problem"]:
+                    writer.writerow(dict(row, status="missing_folder", name=""))
+                    continue
+                for name in result["missing"]:
+                    writer.writerow(dict(row, status="missing", name=name))
+                for name in result["unexpected"]:
+                    writer.writerow(dict(row, status="unexpected", name=name, suggested_name=renames.get(name, "")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a project tree against the mapping sets.")
+    parser.add_argument("root", help="Root folder of the delivery or project tree")
+    parser.add_argument("--types", nargs="+", choices=sorted(TYPE_ALIASES),
+                        help="Mapping types to check (default: best match per folder)")
+    parser.add_argument("--mappings", help="Folder holding the mapping files (default: mappings next to the script)")
+    parser.add_argument("--json", dest="json_path", help="Write the full report as JSON")
+    parser.add_argument("--csv", dest="csv_path", help="Write missing/unexpected names as CSV")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Directories listed (and, with --health, clips analyzed) at once")
+    parser.add_argument("--health", action="store_true",
+                        help="Also check every clip for truncation, silence, clipping and sample rate")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"{args.root} is not a folder")
+    mappings, errors = load_mapping_index(args.mappings)
+    mapping_types = [TYPE_ALIASES[name] for name in args.types] if args.types else None
+    for mapping_type in mapping_types or MAPPING_TYPES:
+        if mapping_type in errors:
+            if mapping_types:
+                parser.error(errors[mapping_type])
+            print(f"Skipping {mapping_type}: {errors[mapping_type]}", file=sys.stderr)
+    if not mappings:
+        parser.error("No mapping files could be loaded")
+
+    report = build_report(args.root, mappings, mapping_types, max(1, args.workers), args.health)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.csv_path:
+        write_csv_report(args.csv_path, report)
+
+    summary = report["summary"]
+    print(f"Scanned {summary['folders_scanned']} folders in {report['seconds']:.2f}s; "
+          f"checked {summary['folders_checked']}.")
+    print(f"Expected {summary['expected']}, present {summary['present']}, missing {summary['missing']} "
+          f"({summary['missing_folders']} missing folders), unexpected {summary['unexpected']}, "
+          f"suggested renames {summary['suggested_renames']}.")
+    if args.health:
+        print(f"Audio health: {summary['health_problems']} files with problems.")
+    for path, error in report["unreadable_folders"].items():
+        print(f"Could not read {path}: {error}", file=sys.stderr)
+    return 1 if summary["missing"] or summary.get("health_problems") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
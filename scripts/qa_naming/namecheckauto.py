@@ -6,50 +6,28 @@ against actual files on disk to catch missing or misnamed assets early.
 """
 
 import os
+import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-from itertools import combinations
+
+from inventory import (MAPPING_TYPES, InventoryWatcher, best_mapping_for, combine_references, compare_inventory,
+                       load_mapping_index, scan_inventory)
+from near_match import write_rename_csv
 
 def select_root_folder():
     folder_path = filedialog.askdirectory(title="Select Root Folder to Analyze")
     root_folder_var.set(folder_path)
 
 def load_reference_files(mapping_types):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    mapping_dir = os.path.join(script_dir, "mappings")
-
-    if not os.path.exists(mapping_dir):
-        messagebox.showerror("Error", f"Mapping directory '{mapping_dir}' not found!")
-        return None
-
-    reference_files = []
-    if "Names" in mapping_types:
-        reference_files.extend([
-            "1-SYL.txt", "2-SYL_001.txt", "2-SYL_002.txt",
-            "2-SYL_003.txt", "2-SYL_004.txt", "3-SYL.txt", "4-SYL.txt"
-        ])
-    if "Ordinal (Numbers)" in mapping_types:
-        reference_files.extend([f"{i}_NUM_ORD.txt" for i in range(1, 5)])
-    if "Cardinal (Numbers)" in mapping_types:
-        reference_files.extend([f"{i}_NUM_CAR.txt" for i in range(1, 5)])
-
-    references = {}
-    for file_name in reference_files:
-        file_path = os.path.join(mapping_dir, file_name)
-        if os.path.exists(file_path):
-            ref_key = file_name.split(".")[0]
-            if "NUM" in ref_key:
-                ref_key = f"{ref_key.split('_')[0]}-SYL_NUM"
-            with open(file_path, "r") as f:
-                references.setdefault(ref_key, []).extend(
-                    line.strip() for line in f if line.strip() and "REMOVE" not in line
-                )
-        else:
-            messagebox.showerror("Error", f"Reference file {file_name} not found!")
+    mappings, errors = load_mapping_index()
+    for mapping_type in mapping_types:
+        if mapping_type in errors:
+            messagebox.showerror("Error", errors[mapping_type])
             return None
-    return references
+    return combine_references(mappings, mapping_types)
 
-def analyze_files():
+def analyze_files(inventory=None, references=None):
     root_folder = root_folder_var.get().strip().strip('"')  # Sanitize the path
     mapping_types = [var.get() for var in mapping_type_vars if var.get()]
     mode = analysis_mode_var.get()
@@ -58,78 +36,41 @@ def analyze_files():
         messagebox.showerror("Error", "Please select a root folder to analyze.")
         return
 
-    references = load_reference_files(mapping_types)
+    if references is None:
+        references = load_reference_files(mapping_types)
     if not references:
         return
 
-    result_text.config(state=tk.NORMAL)
-    result_text.delete(1.0, tk.END)
-
-    if mode == "Root Folder":
+    if inventory is None:
         try:
-            actual_files = {
-                os.path.splitext(file[file.find('_'):])[0]
-                for file in os.listdir(root_folder)
-                if os.path.isfile(os.path.join(root_folder, file)) and '_' in file
-            }
-        except Exception as e:
+            inventory = scan_inventory(root_folder)
+        except OSError as e:
             messagebox.showerror("Error", f"Could not read the root folder: {e}")
             return
 
-        for ref_name, expected_files in references.items():
-            reference_set = {os.path.splitext(name)[0] for name in expected_files}
-            missing_files = reference_set - actual_files
-
-            result_text.insert(tk.END, f"Analysis for reference: {ref_name}\n")
-            if missing_files:
-                result_text.insert(tk.END, "  Missing files:\n")
-                for file in sorted(missing_files):
-                    result_text.insert(tk.END, f"    {file}\n")
-            else:
-                result_text.insert(tk.END, "  All files listed are present.\n")
-            result_text.insert(tk.END, "\n")
-
-    elif mode == "Subfolders":
-        try:
-            subfolders = {folder.strip(): folder for folder in os.listdir(root_folder) if os.path.isdir(os.path.join(root_folder, folder))}
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not read the root folder: {e}")
-            return
+    result_text.config(state=tk.NORMAL)
+    result_text.delete(1.0, tk.END)
 
-        for folder_key, expected_files in references.items():
-            if folder_key.endswith("-SYL_NUM"):
-                num_key = folder_key
-            else:
-                num_key = folder_key
-
-            subfolder_path = subfolders.get(num_key)
-
-            if not subfolder_path:
-                result_text.insert(tk.END, f"Missing subfolder for: {num_key}\n")
-                continue
-
-            full_subfolder_path = os.path.join(root_folder, subfolder_path)
-            try:
-                actual_files = {
-                    os.path.splitext(file[file.find('_'):])[0]
-                    for file in os.listdir(full_subfolder_path)
-                    if '_' in file
-                }
-            except Exception as e:
-                result_text.insert(tk.END, f"Error reading subfolder {folder_key}: {e}\n")
-                continue
-
-            reference_set = {os.path.splitext(name)[0] for name in expected_files}
-            missing_files = reference_set - actual_files
-
-            result_text.insert(tk.END, f"Analysis for subfolder: {num_key}\n")
-            if missing_files:
-                result_text.insert(tk.END, "  Missing files:\n")
-                for file in sorted(missing_files):
-                    result_text.insert(tk.END, f"    {file}\n")
-            else:
-                result_text.insert(tk.END, "  All files listed are present.\n")
-            result_text.insert(tk.END, "\n")
+    label = "reference" if mode == "Root Folder" else "subfolder"
+    lines = []
+    rename_suggestions.clear()
+    for result in compare_inventory(references, inventory, mode):
+        if result["problem"]:
+            lines.append(result["problem"])
+            continue
+        lines.append(f"Analysis for {label}: {result['reference']}")
+        if result["missing"]:
+            lines.append("  Missing files:")
+            lines.extend(f"    {file}" for file in result["missing"])
+        else:
+            lines.append("  All files listed are present.")
+        if result["suggestions"]:
+            lines.append("  Possible misnamed files:")
+            lines.extend(f"    {present} -> {correct} (edit distance {distance})"
+                         for present, correct, distance in result["suggestions"])
+            rename_suggestions.extend(result["suggestions"])
+        lines.append("")
+    result_text.insert(tk.END, "\n".join(lines) + "\n")
 
     result_text.config(state=tk.DISABLED)
 
@@ -140,162 +81,221 @@ def auto_analyze():
         messagebox.showerror("Error", "Please select a root folder to analyze.")
         return
 
-    is_single_folder = True
+    # One directory scan and one mapping load; every combination is scored in memory
     try:
-        items = os.listdir(root_folder)
-        for item in items:
-            if os.path.isdir(os.path.join(root_folder, item)):
-                is_single_folder = False
-                break
-    except Exception as e:
+        inventory = scan_inventory(root_folder)
+    except OSError as e:
         messagebox.showerror("Error", f"Could not read the root folder: {e}")
         return
-
-    best_mapping = None
-    max_matches = 0
-    min_missing_files = float('inf')
+    mappings, errors = load_mapping_index()
+    for mapping_type, error in errors.items():
+        print(f"{mapping_type}: {error}")
 
     print("Starting analysis...")
+    mode = "Root Folder" if inventory.is_single_folder else "Subfolders"
+    best = best_mapping_for(mappings, inventory, mode)
 
-    # Combinations excluding "Ordinal (Numbers)" and "Cardinal (Numbers)" together
-    possible_combinations = [
-        ("Names",),
-        ("Ordinal (Numbers)",),
-        ("Cardinal (Numbers)",),
-        ("Names", "Ordinal (Numbers)"),
-        ("Names", "Cardinal (Numbers)"),
-    ]
-
-    for mapping_comb in possible_combinations:
-        print(f"Trying combination: {mapping_comb}")
-        references = load_reference_files(mapping_comb)
-        if not references:
-            print("No references found for this combination.")
-            continue
-
-        match_count = 0
-        total_missing_files = 0
-        valid_combination = False
-
-        if is_single_folder:
-            try:
-                actual_files = {
-                    os.path.splitext(file[file.find('_'):])[0]
-                    for file in os.listdir(root_folder)
-                    if os.path.isfile(os.path.join(root_folder, file)) and '_' in file
-                }
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not read the root folder: {e}")
-                return
-
-            for expected_files in references.values():
-                reference_set = {os.path.splitext(name)[0] for name in expected_files}
-                matches = reference_set & actual_files
-                match_count += len(matches)
-                missing_files = reference_set - actual_files
-                total_missing_files += len(missing_files)
-                print(f"Matches for combination {mapping_comb}: {match_count}, Missing files: {len(missing_files)}")
-                if match_count > 0:
-                    valid_combination = True
-
-        else:
-            try:
-                subfolders = {folder.strip(): folder for folder in os.listdir(root_folder) if os.path.isdir(os.path.join(root_folder, folder))}
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not read the root folder: {e}")
-                return
-
-            for folder_key, expected_files in references.items():
-                if folder_key.endswith("-SYL_NUM"):
-                    num_key = folder_key
-                else:
-                    num_key = folder_key
-
-                subfolder_path = subfolders.get(num_key)
-                if not subfolder_path:
-                    total_missing_files += len(expected_files)
-                    continue
-
-                full_subfolder_path = os.path.join(root_folder, subfolder_path)
-                try:
-                    actual_files = {
-                        os.path.splitext(file[file.find('_'):])[0]
-                        for file in os.listdir(full_subfolder_path)
-                        if '_' in file
-                    }
-                except Exception as e:
-                    messagebox.showerror("Error", f"Error reading subfolder {folder_key}: {e}\n")
-                    continue
-
-                reference_set = {os.path.splitext(name)[0] for name in expected_files}
-                matches = reference_set & actual_files
-                match_count += len(matches)
-                missing_files = reference_set - actual_files
-                total_missing_files += len(missing_files)
-                print(f"Matches for combination {mapping_comb}: {match_count}, Missing files: {len(missing_files)}")
-                if match_count > 0:
-                    valid_combination = True
-
-        if valid_combination and (match_count > max_matches or (match_count == max_matches and total_missing_files < min_missing_files)):
-            max_matches = match_count
-            min_missing_files = total_missing_files
-            best_mapping = mapping_comb
-
-    if best_mapping:
+    if best:
+        best_mapping, max_matches, min_missing_files = best
         print(f"Best mapping found: {best_mapping} with {max_matches} matches and {min_missing_files} missing files")
         # Set the mapping_type_vars based on the best_mapping
-        for var, text in zip(mapping_type_vars, ["Names", "Ordinal (Numbers)", "Cardinal (Numbers)"]):
+        for var, text in zip(mapping_type_vars, MAPPING_TYPES):
             if text in best_mapping:
                 var.set(text)
             else:
                 var.set("")
         # Set the analysis mode
-        if is_single_folder:
-            analysis_mode_var.set("Root Folder")
-        else:
-            analysis_mode_var.set("Subfolders")
-        # Run the analysis with the best mapping
+        analysis_mode_var.set(mode)
+        # Run the analysis with the best mapping, reusing the index
         print(f"Running analysis with mapping: {best_mapping}")
-        analyze_files()
+        analyze_files(inventory, combine_references(mappings, best_mapping))
     else:
         result_text.config(state=tk.NORMAL)
         result_text.delete(1.0, tk.END)
         result_text.insert(tk.END, "No suitable mapping type found.\n")
         result_text.config(state=tk.DISABLED)
 
-# GUI setup
-root = tk.Tk()
-root.title("Title Checker")
-root.geometry("800x700")
+# Near-miss renames found by the last analysis, for export to title_fix.py
+rename_suggestions = []
 
-root_folder_var = tk.StringVar()
-mapping_type_vars = [tk.StringVar() for _ in range(3)]
-analysis_mode_var = tk.StringVar(value="Subfolders")  # Default to "Subfolders"
+def export_renames():
+    if not rename_suggestions:
+        messagebox.showinfo("Export Renames", "The last analysis found no near-miss names to rename.")
+        return
+    csv_path = filedialog.asksaveasfilename(
+        title="Save Rename CSV",
+        initialdir=os.path.dirname(os.path.abspath(__file__)),
+        initialfile="Name Error Correction List - Sheet2.csv",
+        defaultextension=".csv",
+        filetypes=[("CSV files", "*.csv")],
+    )
+    if not csv_path:
+        return
+    try:
+        count = write_rename_csv(csv_path, rename_suggestions)
+    except OSError as e:
+        messagebox.showerror("Error", f"Could not write the rename CSV: {e}")
+        return
+    messagebox.showinfo("Export Renames", f"Wrote {count} suggested renames to {csv_path}.\n"
+                                          "Review them, then run title_fix.py to apply.")
 
-tk.Label(root, text="Root Folder to Analyze:").pack(pady=5)
-tk.Entry(root, textvariable=root_folder_var, width=60).pack()
-tk.Button(root, text="Browse Root Folder", command=select_root_folder).pack(pady=5)
+# Background audio health scan started from the GUI: the thread and its results
+health_thread = None
+health_root = None
+health_results = {}
 
-tk.Label(root, text="Mapping Type:").pack(pady=5)
+def check_audio_health():
+    global health_thread, health_root
+    root_folder = root_folder_var.get().strip().strip('"')  # Sanitize the path
+    if not root_folder:
+        messagebox.showerror("Error", "Please select a root folder to analyze.")
+        return
+    try:
+        import audio_health  # Needs NumPy, which is only required for the health scan
+        inventory = scan_inventory(root_folder)
+    except ImportError as e:
+        messagebox.showerror("Error", f"The audio health check needs NumPy: {e}")
+        return
+    except OSError as e:
+        messagebox.showerror("Error", f"Could not read the root folder: {e}")
+        return
+
+    if analysis_mode_var.get() == "Root Folder":
+        folders = [root_folder]
+    else:
+        folders = [os.path.join(root_folder, folder_name) for folder_name, _, _ in inventory.subfolders.values()]
+    paths = audio_health.audio_files_in(folders)
+    if not paths:
+        messagebox.showinfo("Audio Health", "No audio files found to check.")
+        return
 
-mapping_frame = tk.Frame(root)
-mapping_frame.pack(pady=5)
-for text, var in zip(["Names", "Ordinal (Numbers)", "Cardinal (Numbers)"], mapping_type_vars):
-    tk.Checkbutton(mapping_frame, text=text, variable=var, onvalue=text, offvalue="").pack(side=tk.LEFT)
+    health_button.config(state=tk.DISABLED)
+    watch_status_var.set(f"Checking audio health of {len(paths)} files...")
+    health_results.clear()
+    health_root = root_folder
 
-mode_frame = tk.Frame(root)
-mode_frame.pack(pady=5)
-tk.Label(root, text="Analysis Mode:").pack(pady=5)
-tk.Radiobutton(mode_frame, text="Subfolders", variable=analysis_mode_var, value="Subfolders").pack(side=tk.LEFT)
-tk.Radiobutton(mode_frame, text="Single Folder", variable=analysis_mode_var, value="Root Folder").pack(side=tk.LEFT)
+    def run():
+        health_results.update(audio_health.scan_health(paths))
 
-button_frame = tk.Frame(root)
-button_frame.pack(pady=10)
-tk.Button(button_frame, text="Analyze Files", command=analyze_files, bg="yellow", fg="black").pack(side=tk.LEFT, padx=10)
-tk.Button(button_frame, text="Auto-Analyze", command=auto_analyze, bg="orange", fg="black").pack(side=tk.LEFT, padx=10)
+    health_thread = threading.Thread(target=run, daemon=True)
+    health_thread.start()
+    root.after(200, finish_audio_health)
 
-tk.Label(root, text="Results:").pack(pady=5)
-result_text = scrolledtext.ScrolledText(root, width=80, height=20, state=tk.DISABLED)
-result_text.pack(pady=5)
+def finish_audio_health():
+    if health_thread.is_alive():
+        root.after(200, finish_audio_health)
+        return
+    import audio_health
+    health_button.config(state=tk.NORMAL)
+    watch_status_var.set("Audio health check finished." if watcher is None else watch_status_var.get())
+    expected_rate = audio_health.common_sample_rate(health_results)
+    lines = [f"Audio health: {len(health_results)} files checked"
+             + (f", expected sample rate {expected_rate} Hz" if expected_rate else "")]
+    problems = 0
+    for path, result in sorted(health_results.items()):
+        issues = audio_health.health_issues(result, expected_rate)
+        if issues:
+            problems += 1
+            lines.append(f"  {os.path.relpath(path, health_root)}: {'; '.join(issues)}")
+    if not problems:
+        lines.append("  All clips look healthy.")
+    result_text.config(state=tk.NORMAL)
+    result_text.insert(tk.END, "\n".join(lines) + "\n\n")
+    result_text.see(tk.END)
+    result_text.config(state=tk.DISABLED)
+
+# Polling interval and state of the GUI watch mode
+WATCH_INTERVAL_MS = 2000
+watcher = None
 
-root.mainloop()
+def toggle_watch():
+    global watcher
+    if watcher is not None:
+        watcher = None
+        watch_button.config(text="Start Watching")
+        watch_status_var.set("Not watching.")
+        return
+
+    root_folder = root_folder_var.get().strip().strip('"')  # Sanitize the path
+    if not root_folder:
+        messagebox.showerror("Error", "Please select a root folder to analyze.")
+        return
+    mapping_types = [var.get() for var in mapping_type_vars if var.get()]
+    references = load_reference_files(mapping_types)
+    if not references:
+        messagebox.showerror("Error", "Please select the mapping types to watch (or run Auto-Analyze first).")
+        return
+    try:
+        watcher = InventoryWatcher(root_folder, references, analysis_mode_var.get())
+    except OSError as e:
+        messagebox.showerror("Error", f"Could not read the root folder: {e}")
+        return
+    watch_button.config(text="Stop Watching")
+    analyze_files()
+    show_watch_status([])
+    root.after(WATCH_INTERVAL_MS, poll_watch)
+
+def poll_watch():
+    if watcher is None:
+        return
+    show_watch_status(watcher.poll())
+    root.after(WATCH_INTERVAL_MS, poll_watch)
+
+def show_watch_status(changes):
+    present, expected, missing = watcher.totals()
+    watch_status_var.set(f"Watching: {present} of {expected} present, {missing} missing "
+                         f"(updated {time.strftime('%H:%M:%S')})")
+    if changes:
+        stamp = time.strftime("%H:%M:%S")
+        result_text.config(state=tk.NORMAL)
+        result_text.insert(tk.END, "\n".join(
+            f"[{stamp}] {'+' if change == 'added' else '-'} {name} ({ref_key})"
+            for ref_key, name, change in sorted(changes)) + "\n")
+        result_text.see(tk.END)
+        result_text.config(state=tk.DISABLED)
+
+# GUI setup
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Title Checker")
+    root.geometry("800x700")
+
+    root_folder_var = tk.StringVar()
+    mapping_type_vars = [tk.StringVar() for _ in range(3)]
+    analysis_mode_var = tk.StringVar(value="Subfolders")  # Default to "Subfolders"
+
+    tk.Label(root, text="Root Folder to Analyze:").pack(pady=5)
+    tk.Entry(root, textvariable=root_folder_var, width=60).pack()
+    tk.Button(root, text="Browse Root Folder", command=select_root_folder).pack(pady=5)
+
+    tk.Label(root, text="Mapping Type:").pack(pady=5)
+
+    mapping_frame = tk.Frame(root)
+    mapping_frame.pack(pady=5)
+    for text, var in zip(MAPPING_TYPES, mapping_type_vars):
+        tk.Checkbutton(mapping_frame, text=text, variable=var, onvalue=text, offvalue="").pack(side=tk.LEFT)
+
+    mode_frame = tk.Frame(root)
+    mode_frame.pack(pady=5)
+    tk.Label(root, text="Analysis Mode:").pack(pady=5)
+    tk.Radiobutton(mode_frame, text="Subfolders", variable=analysis_mode_var, value="Subfolders").pack(side=tk.LEFT)
+    tk.Radiobutton(mode_frame, text="Single Folder", variable=analysis_mode_var, value="Root Folder").pack(side=tk.LEFT)
+
+    button_frame = tk.Frame(root)
+    button_frame.pack(pady=10)
+    tk.Button(button_frame, text="Analyze Files", command=analyze_files, bg="yellow", fg="black").pack(side=tk.LEFT, padx=10)
+    tk.Button(button_frame, text="Auto-Analyze", command=auto_analyze, bg="orange", fg="black").pack(side=tk.LEFT, padx=10)
+    tk.Button(button_frame, text="Export Renames", command=export_renames).pack(side=tk.LEFT, padx=10)
+    watch_button = tk.Button(button_frame, text="Start Watching", command=toggle_watch)
+    watch_button.pack(side=tk.LEFT, padx=10)
+    health_button = tk.Button(button_frame, text="Check Audio Health", command=check_audio_health)
+    health_button.pack(side=tk.LEFT, padx=10)
+
+    watch_status_var = tk.StringVar(value="Not watching.")
+    tk.Label(root, textvariable=watch_status_var).pack()
+
+    tk.Label(root, text="Results:").pack(pady=5)
+    result_text = scrolledtext.ScrolledText(root, width=80, height=20, state=tk.DISABLED)
+    result_text.pack(pady=5)
+
+    root.mainloop()
@@ -0,0 +1,136 @@
+"""
+near_match.py
+
+Near-miss matching for the name checker. Pairs expected names that are missing
+with unexpected names found on disk (typos, swapped letters, stray characters)
+using a character-bigram inverted index to shortlist candidates and edit distance
+to confirm them, so each lookup only compares a handful of on-disk names instead
+of every pair. The pairs can be written as
+a rename CSV in the format title_fix.py reads.
+"""
+
+import csv
+
+# Largest edit distance suggested, whatever the name length
+MAX_DISTANCE = 2
+
+# Column names expected by title_fix.py
+CSV_FIELDS = ["Present Titles", "Correct Titles"]
+
+
+# Function to compute the edit distance between two strings, counting insertions,
+# deletions, substitutions and swaps of adjacent characters (optimal string alignment).
+# Gives up, returning limit + 1, as soon as the distance is known to exceed limit.
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before_previous[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+# Function to get the largest distance allowed for a name: short names tolerate less,
+# so "_Al" is not "corrected" to "_Bo"
+def allowed_distance(name, max_distance=MAX_DISTANCE):
+    return min(max_distance, max(1, len(name.lstrip('_')) // 4))
+
+
+# Function to get the distinct padded character bigrams of a name
+def bigrams(name):
+    padded = f"^{name}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NGramIndex:
+    """Inverted index from character bigrams to the names containing them.
+
+    One edit removes at most three distinct bigrams from a name (two for an insertion,
+    deletion or substitution, three for a swap), so a name within distance d of a
+    query keeps at least len(query bigrams) - 3 * d of them. Any such name must
+    therefore contain one of the query's 3 * d + 1 rarest bigrams, and only those
+    posting lists are read.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.postings = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        position = len(self.names)
+        self.names.append(name)
+        for gram in bigrams(name):
+            self.postings.setdefault(gram, []).append(position)
+
+    # Function to find every indexed name within tolerance of name, as (distance, name) pairs.
+    # Names sharing no bigram at all with a very short query are not considered.
+    def search(self, name, tolerance):
+        grams = bigrams(name)
+        needed = len(grams) - 3 * tolerance
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        probe = rarest if needed <= 0 else rarest[:len(grams) - needed + 1]
+        candidates = set()
+        for gram in probe:
+            candidates.update(self.postings.get(gram, ()))
+
+        found = []
+        for position in candidates:
+            candidate = self.names[position]
+            if abs(len(candidate) - len(name)) > tolerance:
+                continue
+            if needed > 0 and len(grams & bigrams(candidate)) < needed:
+                continue
+            distance = edit_distance(name, candidate, tolerance)
+            if distance <= tolerance:
+                found.append((distance, candidate))
+        return found
+
+
+# Function to suggest renames from unexpected on-disk names to missing expected names.
+# Each name is used at most once, closest pairs first. Returns a sorted list of
+# (present name, correct name, distance).
+def suggest_renames(missing_names, unexpected_names, max_distance=MAX_DISTANCE):
+    if not missing_names or not unexpected_names:
+        return []
+    index = NGramIndex(sorted(unexpected_names))
+    pairs = []
+    for name in missing_names:
+        for distance, candidate in index.search(name, allowed_distance(name, max_distance)):
+            pairs.append((distance, candidate, name))
+
+    suggestions = []
+    used_present = set()
+    used_correct = set()
+    for distance, present, correct in sorted(pairs):
+        if present in used_present or correct in used_correct:
+            continue
+        used_present.add(present)
+        used_correct.add(correct)
+        suggestions.append((present, correct, distance))
+    return sorted(suggestions)
+
+
+# Function to write suggestions as a title_fix rename CSV. A present name suggested for
+# more than one correct name (e.g. in different subfolders) keeps its first suggestion.
+def write_rename_csv(csv_path, suggestions):
+    written = set()
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for present, correct, _ in suggestions:
+            if present in written:
+                continue
+            written.add(present)
+            writer.writerow({"Present Titles": present, "Correct Titles": correct})
+    return len(written)
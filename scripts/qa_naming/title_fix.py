@@ -7,67 +7,175 @@ enforcing naming conventions.
 
 import os
 import csv
+import json
+import sys
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
 
-# Function to rename files based on the CSV mapping
-def rename_files(target_folder, log_output):
-    try:
-        # Path to the CSV file in the script's root directory
-        script_root = os.path.dirname(os.path.abspath(__file__))
-        csv_file = os.path.join(script_root, "Name Error Correction List - Sheet2.csv")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.audio_probe import cache_dir
+from common.bulk_rename import apply_plan, pending_batch, plan_renames, resume, undo_last
 
-        # Check if CSV file exists
-        if not os.path.exists(csv_file):
-            log_output.insert(tk.END, f"Error: CSV file '{csv_file}' not found.\n")
-            return
+INDEX_CACHE_VERSION = 1
 
-        # Load CSV file into a dictionary
-        title_mapping = {}
-        with open(csv_file, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                correct_title = row['Correct Titles'].strip()
-                present_title = row['Present Titles'].strip()
+# Trie key marking the end of a present title (never a single character, so it cannot
+# collide with a child key)
+TRIE_END = ""
+
+# Function to load the CSV mapping of present titles to correct titles (later rows win)
+def load_title_mapping(csv_file):
+    title_mapping = {}
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            correct_title = row['Correct Titles'].strip()
+            present_title = row['Present Titles'].strip()
+            if present_title:
                 title_mapping[present_title] = correct_title
+    return title_mapping
+
+# Function to compile a title mapping into a prefix trie of nested dicts
+def build_title_trie(title_mapping):
+    trie = {}
+    for present_title, correct_title in title_mapping.items():
+        node = trie
+        for char in present_title:
+            node = node.setdefault(char, {})
+        node[TRIE_END] = correct_title
+    return trie
 
-        # Process each file in the target folder
-        renamed_count = 0
-        for filename in os.listdir(target_folder):
-            file_path = os.path.join(target_folder, filename)
+# Function to find the longest present title that the text starts with, in time
+# proportional to the length of the text. Returns (matched length, correct title) or None.
+def longest_prefix_match(trie, text):
+    match = None
+    node = trie
+    for position, char in enumerate(text):
+        node = node.get(char)
+        if node is None:
+            break
+        if TRIE_END in node:
+            match = (position + 1, node[TRIE_END])
+    return match
+
+# Function to load the compiled trie for a CSV, reusing the cached copy while the CSV's
+# size and modification time are unchanged
+def load_title_index(csv_file):
+    csv_file = os.path.abspath(csv_file)
+    stat_result = os.stat(csv_file)
+    cache_path = os.path.join(cache_dir(), "title_index_cache.json")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get("version") != INDEX_CACHE_VERSION:
+            cache = {"version": INDEX_CACHE_VERSION, "entries": {}}
+    except (OSError, ValueError):
+        cache = {"version": INDEX_CACHE_VERSION, "entries": {}}
+
+    entry = cache["entries"].get(csv_file)
+    if entry and entry["size"] == stat_result.st_size and entry["mtime_ns"] == stat_result.st_mtime_ns:
+        return entry["trie"], entry["count"]
+
+    title_mapping = load_title_mapping(csv_file)
+    trie = build_title_trie(title_mapping)
+    cache["entries"][csv_file] = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns,
+                                  "count": len(title_mapping), "trie": trie}
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # The cache only saves time; renaming works without it
+    return trie, len(title_mapping)
+
+# Journal of applied rename batches, kept in the renamed folder
+JOURNAL_FILE = ".rename_journal.jsonl"
+
+# Largest number of plan lines shown in the log; the summary always covers the whole plan
+PREVIEW_LINES = 2000
+
+# Function to list the renames the CSV mapping asks for in a folder, as (old path, new path)
+def plan_title_fixes(target_folder, title_trie):
+    pairs = []
+    with os.scandir(target_folder) as entries:
+        for entry in entries:
+            filename = entry.name
 
             # Check for valid audio files
-            if not (filename.endswith(('.wav', '.mp3', '.flac')) and os.path.isfile(file_path)):
+            if not (filename.endswith(('.wav', '.mp3', '.flac')) and entry.is_file()):
                 continue  # Skip non-audio files or directories
-            
+
             # Extract the prefix and title segment
             prefix, _, rest = filename.partition("_")
             if not rest:
                 continue  # Skip files with unexpected formats
-            
+
             title_segment = "_" + rest  # Reattach the underscore
 
-            # Search for a match in the CSV title mapping
-            for present_title, correct_title in title_mapping.items():
-                if title_segment.startswith(present_title):
-                    updated_title = title_segment.replace(present_title, correct_title, 1)
-                    new_filename = f"{prefix}{updated_title}"
-                    
-                    # Handle path sanitization
-                    new_path = os.path.join(target_folder, new_filename)
-                    os.rename(file_path, new_path)
-                    
-                    # Log the change
-                    log_output.insert(tk.END, f'Renamed: "{filename}" -> "{new_filename}"\n')
-                    renamed_count += 1
-                    break
-
-        log_output.insert(tk.END, f"\nRenaming Complete: {renamed_count} files updated.\n")
+            # Look up the longest present title the segment starts with
+            match = longest_prefix_match(title_trie, title_segment)
+            if match:
+                matched_length, correct_title = match
+                updated_title = correct_title + title_segment[matched_length:]
+                pairs.append((entry.path, os.path.join(target_folder, f"{prefix}{updated_title}")))
+    return pairs
+
+# Function to render a plan for the log as one block of text (capped at PREVIEW_LINES)
+def format_plan(plan):
+    lines = [f'Rename: "{os.path.basename(src)}" -> "{os.path.basename(dst)}"' for src, dst in plan.renames]
+    lines.extend(f'Skip: "{os.path.basename(item.src)}" -> "{os.path.basename(item.dst)}" ({item.reason})'
+                 for item in plan.skipped)
+    if len(lines) > PREVIEW_LINES:
+        lines = lines[:PREVIEW_LINES] + [f"... and {len(lines) - PREVIEW_LINES} more"]
+    temp_steps = len(plan.steps) - len(plan.renames)
+    lines.append(f"\nPlan: {len(plan.renames)} renames, {len(plan.skipped)} skipped"
+                 + (f", {temp_steps} temporary-name steps for chains/cycles" if temp_steps else ""))
+    return "\n".join(lines) + "\n"
+
+# Function to rename files based on the CSV mapping. The full plan is built first; with
+# dry_run it is only shown, otherwise it is applied as one journaled batch.
+def rename_files(target_folder, log_output, dry_run=False):
+    try:
+        # Path to the CSV file in the script's root directory
+        script_root = os.path.dirname(os.path.abspath(__file__))
+        csv_file = os.path.join(script_root, "Name Error Correction List - Sheet2.csv")
+
+        # Check if CSV file exists
+        if not os.path.exists(csv_file):
+            log_output.insert(tk.END, f"Error: CSV file '{csv_file}' not found.\n")
+            return
+
+        # Compiled prefix trie of the CSV mapping (cached between runs)
+        title_trie, _ = load_title_index(csv_file)
+        plan = plan_renames(plan_title_fixes(target_folder, title_trie))
+        log_output.insert(tk.END, format_plan(plan))
+
+        if dry_run:
+            log_output.insert(tk.END, "\nPreview only: no files were renamed.\n")
+        elif plan.steps:
+            apply_plan(plan, os.path.join(target_folder, JOURNAL_FILE))
+            log_output.insert(tk.END, f"\nRenaming Complete: {len(plan.renames)} files updated.\n")
+        else:
+            log_output.insert(tk.END, "\nRenaming Complete: 0 files updated.\n")
         log_output.see(tk.END)  # Scroll to the end of the log
 
     except Exception as e:
         log_output.insert(tk.END, f"Error: {e}\n")
 
+# Function to undo the last rename batch in a folder
+def undo_renames(target_folder, log_output):
+    try:
+        undone = undo_last(os.path.join(target_folder, JOURNAL_FILE))
+        if undone is None:
+            log_output.insert(tk.END, "Nothing to undo in this folder.\n")
+        else:
+            batch_id, count = undone
+            log_output.insert(tk.END, f"Undid batch {batch_id}: {count} rename steps reverted.\n")
+    except Exception as e:
+        log_output.insert(tk.END, f"Error: {e}\n")
+    log_output.see(tk.END)
+
 # Function to browse for folder
 def browse_folder(entry_field):
     folder_selected = filedialog.askdirectory()
@@ -75,8 +183,8 @@ def browse_folder(entry_field):
         entry_field.delete(0, tk.END)
         entry_field.insert(0, folder_selected)
 
-# Function to start the renaming process
-def start_renaming(folder_entry, log_output):
+# Function to start the renaming process (or its preview, or an undo)
+def start_renaming(folder_entry, log_output, dry_run=False, undo=False):
     target_folder = folder_entry.get().strip()
 
     # Validate folder path
@@ -86,7 +194,27 @@ def start_renaming(folder_entry, log_output):
 
     log_output.delete(1.0, tk.END)  # Clear previous logs
     log_output.insert(tk.END, f"Processing folder: {target_folder}\n\n")
-    rename_files(target_folder, log_output)
+
+    # An interrupted batch has to be finished (or undone) before new renames run here
+    journal_path = os.path.join(target_folder, JOURNAL_FILE)
+    pending = pending_batch(journal_path)
+    if pending is not None and not dry_run and not undo:
+        batch_id, batch = pending
+        remaining = len(batch["steps"]) - len(batch["done"])
+        if messagebox.askyesno("Resume Renaming",
+                               f"A rename batch in this folder was interrupted with {remaining} steps left.\n"
+                               "Finish it now? (Choose No to leave it; Undo Last Batch rolls it back instead.)"):
+            try:
+                resume(journal_path)
+                log_output.insert(tk.END, f"Resumed batch {batch_id}: {remaining} steps completed.\n\n")
+            except OSError as e:
+                log_output.insert(tk.END, f"Error: {e}\n")
+        return
+
+    if undo:
+        undo_renames(target_folder, log_output)
+    else:
+        rename_files(target_folder, log_output, dry_run)
 
 # Build the Tkinter GUI
 def build_gui():
@@ -109,10 +237,18 @@ def build_gui():
     browse_button = tk.Button(folder_frame, text="Browse", command=lambda: browse_folder(folder_entry))
     browse_button.pack(side=tk.RIGHT)
 
-    # Run Button
-    run_button = tk.Button(root, text="Run Script", font=("Arial", 12), bg="green", fg="white",
+    # Preview, Run and Undo Buttons
+    button_frame = tk.Frame(root)
+    button_frame.pack(pady=15)
+    preview_button = tk.Button(button_frame, text="Preview", font=("Arial", 12),
+                               command=lambda: start_renaming(folder_entry, log_output, dry_run=True))
+    preview_button.pack(side=tk.LEFT, padx=5)
+    run_button = tk.Button(button_frame, text="Run Script", font=("Arial", 12), bg="green", fg="white",
                            command=lambda: start_renaming(folder_entry, log_output))
-    run_button.pack(pady=15)
+    run_button.pack(side=tk.LEFT, padx=5)
+    undo_button = tk.Button(button_frame, text="Undo Last Batch", font=("Arial", 12),
+                            command=lambda: start_renaming(folder_entry, log_output, undo=True))
+    undo_button.pack(side=tk.LEFT, padx=5)
 
     # Log Output Area
     tk.Label(root, text="Output Log:", font=("Arial", 12)).pack()
@@ -0,0 +1,228 @@
+"""
+session_builder.py
+
+Builds the narration timeline directly as files instead of driving the DAW
+with keystrokes. Reads slide_numbers.txt and the splitter's clip folders,
+places each slide's clips on its own named track one after another (with an
+optional gap between slides), and writes a REAPER project (.RPP) and/or a CSV
+marker list with the start of every slide in seconds and samples.
+
+A clip belongs to the slide whose number is the first "_"-separated part of its
+name, after an optional title prefix ("001_Intro.wav" is slide 001; leading
+zeros are ignored, so slide "1" matches it too).
+
+Usage:
+    python session_builder.py /path/to/split/output --rpp session.rpp --csv markers.csv
+    python session_builder.py clips_a clips_b --gap 1.5 --prefix "Ch1-" --rpp ch1.rpp
+"""
+
+import argparse
+import csv
+import os
+import sys
+from collections import Counter, namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import audio_probe
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.aif', '.aiff', '.ogg', '.m4a')
+
+DEFAULT_SLIDE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slide_numbers.txt")
+
+# One clip on the timeline. Positions are in samples at the session rate; start is the
+# clip's offset from the beginning of the timeline.
+TimelineClip = namedtuple('TimelineClip', ['slide', 'track', 'path', 'start', 'length', 'sample_rate'])
+
+# REAPER source types by file extension (anything else is left to REAPER's WAVE reader)
+RPP_SOURCE_TYPES = {'.mp3': 'MP3', '.flac': 'FLAC', '.ogg': 'VORBIS'}
+
+CSV_FIELDS = ["Slide", "Track", "Clip", "File", "Start (s)", "Length (s)", "Start Sample", "Length Samples"]
+
+
+# Function to read the slide numbers, one per line
+def load_slide_numbers(txt_path=DEFAULT_SLIDE_FILE):
+    with open(txt_path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+# Function to compare slide numbers the way people write them ("007" and "7" are the same slide)
+def slide_key(slide):
+    return (slide.lstrip("0") or "0") if slide.isdigit() else slide
+
+
+# Function to list the audio files in the given folders and their immediate subfolders
+# (the splitter writes one subfolder per source recording)
+def clip_files(folders):
+    paths = []
+    for folder in folders:
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        paths.extend(clip_files_in(entry.path))
+                    elif entry.name.lower().endswith(AUDIO_EXTENSIONS) and entry.is_file():
+                        paths.append(entry.path)
+        except OSError:
+            continue
+    return paths
+
+
+# Function to list the audio files directly inside one folder
+def clip_files_in(folder):
+    try:
+        with os.scandir(folder) as entries:
+            return [entry.path for entry in entries
+                    if entry.name.lower().endswith(AUDIO_EXTENSIONS) and entry.is_file()]
+    except OSError:
+        return []
+
+
+# Function to group clips by slide. Returns ([(slide, [clip paths])] in slide order, [clips
+# that match no slide]); each slide's clips are sorted by name.
+def match_slide_clips(slide_numbers, paths, title_prefix=""):
+    by_key = {slide_key(slide): [] for slide in slide_numbers}
+    unmatched = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if title_prefix and name.startswith(title_prefix):
+            name = name[len(title_prefix):]
+        clips = by_key.get(slide_key(name.split("_", 1)[0]))
+        if clips is None:
+            unmatched.append(path)
+        else:
+            clips.append(path)
+    slide_clips = []
+    for slide in slide_numbers:
+        clips = by_key.get(slide_key(slide), [])
+        slide_clips.append((slide, sorted(clips, key=lambda path: os.path.basename(path))))
+    return slide_clips, sorted(unmatched)
+
+
+# Function to lay the slides out one after another, each on its own track. Clip lengths come
+# from the cached header probe; gap_seconds of silence is left after each slide. Returns
+# (session sample rate, [TimelineClip], [(path, error)]).
+def layout_timeline(slide_clips, gap_seconds=0.0, sample_rate=None):
+    probes = {}
+    errors = []
+    for _, clips in slide_clips:
+        for path in clips:
+            try:
+                probes[path] = audio_probe.probe_audio(path)
+            except (OSError, ValueError) as e:
+                errors.append((path, str(e)))
+    audio_probe.save_cache()
+    if sample_rate is None:
+        rates = Counter(probe['sample_rate'] for probe in probes.values() if probe['sample_rate'])
+        sample_rate = rates.most_common(1)[0][0] if rates else 48000
+    gap = int(round(gap_seconds * sample_rate))
+
+    timeline = []
+    position = 0
+    for track, (slide, clips) in enumerate(slide_clips):
+        for path in clips:
+            if path not in probes:
+                continue
+            length = int(round(probes[path]['duration'] * sample_rate))
+            timeline.append(TimelineClip(slide, track, path, position, length, probes[path]['sample_rate']))
+            position += length
+        position += gap
+    return sample_rate, timeline, errors
+
+
+# Function to quote a string for an RPP line
+def rpp_string(text):
+    if '"' not in text:
+        return f'"{text}"'
+    if "'" not in text:
+        return f"'{text}'"
+    return "`" + text.replace("`", "'") + "`"
+
+
+# Function to format seconds for an RPP file
+def rpp_seconds(samples, sample_rate):
+    return f"{samples / sample_rate:.10f}".rstrip("0").rstrip(".") or "0"
+
+
+# Function to write a REAPER project with one named track per slide and a marker at the
+# start of each slide
+def write_rpp(rpp_path, slide_numbers, timeline, sample_rate):
+    clips_by_track = {}
+    for clip in timeline:
+        clips_by_track.setdefault(clip.track, []).append(clip)
+    lines = ['<REAPER_PROJECT 0.1 "6.0"', f"  SAMPLERATE {sample_rate} 0 0"]
+    for track, slide in enumerate(slide_numbers):
+        lines.append("  <TRACK")
+        lines.append(f"    NAME {rpp_string(slide)}")
+        for clip in clips_by_track.get(track, []):
+            source_type = RPP_SOURCE_TYPES.get(os.path.splitext(clip.path)[1].lower(), "WAVE")
+            lines.extend([
+                "    <ITEM",
+                f"      POSITION {rpp_seconds(clip.start, sample_rate)}",
+                f"      LENGTH {rpp_seconds(clip.length, sample_rate)}",
+                f"      NAME {rpp_string(os.path.basename(clip.path))}",
+                f"      <SOURCE {source_type}",
+                f"        FILE {rpp_string(os.path.abspath(clip.path))}",
+                "      >",
+                "    >",
+            ])
+        lines.append("  >")
+    marker = 1
+    for track, slide in enumerate(slide_numbers):
+        clips = clips_by_track.get(track)
+        if clips:
+            lines.append(f"  MARKER {marker} {rpp_seconds(clips[0].start, sample_rate)} {rpp_string(slide)} 0")
+            marker += 1
+    lines.append(">")
+    with open(rpp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# Function to write the timeline as a CSV marker list, one row per clip
+def write_marker_csv(csv_path, timeline, sample_rate):
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for clip in timeline:
+            writer.writerow([clip.slide, clip.track + 1, os.path.basename(clip.path), os.path.abspath(clip.path),
+                             f"{clip.start / sample_rate:.6f}", f"{clip.length / sample_rate:.6f}",
+                             clip.start, clip.length])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a DAW session from slide_numbers.txt and split clips.")
+    parser.add_argument("folders", nargs="+", help="Clip folders (the splitter's output folder works)")
+    parser.add_argument("--slides", default=DEFAULT_SLIDE_FILE, help="Slide list (default: slide_numbers.txt)")
+    parser.add_argument("--prefix", default="",
+                        help="Title prefix used when splitting (the splitter's default is 1.1.1.1)")
+    parser.add_argument("--gap", type=float, default=0.0, help="Seconds of silence after each slide")
+    parser.add_argument("--rate", type=int, help="Session sample rate (default: the clips' most common rate)")
+    parser.add_argument("--rpp", dest="rpp_path", help="Write a REAPER project")
+    parser.add_argument("--csv", dest="csv_path", help="Write a CSV marker list")
+    args = parser.parse_args(argv)
+    if not args.rpp_path and not args.csv_path:
+        parser.error("Give --rpp and/or --csv")
+
+    slide_numbers = load_slide_numbers(args.slides)
+    slide_clips, unmatched = match_slide_clips(slide_numbers, clip_files(args.folders), args.prefix)
+    if not any(clips for _, clips in slide_clips):
+        parser.error(f"No clip matches a slide number with title prefix {args.prefix!r} "
+                     f"({len(unmatched)} clips found); check the folders and --prefix")
+    sample_rate, timeline, errors = layout_timeline(slide_clips, args.gap, args.rate)
+    if args.rpp_path:
+        write_rpp(args.rpp_path, slide_numbers, timeline, sample_rate)
+    if args.csv_path:
+        write_marker_csv(args.csv_path, timeline, sample_rate)
+
+    empty = [slide for slide, clips in slide_clips if not clips]
+    print(f"{len(slide_numbers)} tracks, {len(timeline)} clips at {sample_rate} Hz.")
+    if empty:
+        print(f"Slides without clips: {', '.join(empty)}", file=sys.stderr)
+    if unmatched:
+        print(f"{len(unmatched)} clips match no slide", file=sys.stderr)
+    for path, error in errors:
+        print(f"Could not read {path}: {error}", file=sys.stderr)
+    return 1 if empty or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+timeline_render.py
+
+Renders the slide timeline as a single WAV file for review. The split clips
+(matched to slide_numbers.txt the same way as session_builder.py) are copied in
+slide order into one PCM file with a configurable gap after each slide. Sample
+data is streamed block by block straight from each clip's data chunk, so memory
+use stays flat however long the chapter is. A CSV cue sheet gives the exact
+sample offset of every slide and clip in the render.
+
+All clips must share one sample format, rate and channel count (the splitter's
+output always does); clips that differ from the majority are left out and
+reported.
+
+Usage:
+    python timeline_render.py /path/to/split/output --output chapter.wav --gap 0.75
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+import session_builder
+from session_builder import TimelineClip
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import wav_io
+
+# Bytes copied (or written as silence) at a time
+BLOCK_BYTES = 4 * 1024 * 1024
+
+
+# Function to get the part of a WAV header that has to match for clips to be joined
+def format_key(info):
+    return (info.sample_format, info.bits_per_sample, info.channels, info.sample_rate, info.block_align)
+
+
+# Function to read every clip's header and lay the slides out in samples. Returns
+# (header of the render format, [TimelineClip], {path: WavInfo}, [(path, error)]).
+def layout_render(slide_clips, gap_seconds=0.0):
+    infos = {}
+    errors = []
+    for _, clips in slide_clips:
+        for path in clips:
+            try:
+                info = wav_io.read_wav_info(path)
+            except (OSError, ValueError) as e:
+                errors.append((path, str(e)))
+                continue
+            if info.is_uncompressed:
+                infos[path] = info
+            else:
+                errors.append((path, "not an uncompressed PCM/float WAV"))
+    if not infos:
+        return None, [], infos, errors
+
+    # The most common format wins; the rest cannot be joined without conversion
+    key, _ = Counter(format_key(info) for info in infos.values()).most_common(1)[0]
+    reference = next(info for info in infos.values() if format_key(info) == key)
+    for path, info in list(infos.items()):
+        if format_key(info) != key:
+            errors.append((path, f"format differs from the render ({info.sample_rate} Hz, {info.channels} ch, "
+                                 f"{info.bits_per_sample} bit)"))
+            del infos[path]
+
+    gap = int(round(gap_seconds * reference.sample_rate))
+    timeline = []
+    position = 0
+    for track, (slide, clips) in enumerate(slide_clips):
+        for path in clips:
+            if path in infos:
+                timeline.append(TimelineClip(slide, track, path, position, infos[path].num_frames,
+                                             reference.sample_rate))
+                position += infos[path].num_frames
+        position += gap
+    return reference, timeline, infos, errors
+
+
+# Function to write frames of digital silence (8-bit PCM is unsigned, so its zero is 0x80)
+def write_silence(f, info, frames):
+    silence_byte = b'\x80' if info.sample_format == wav_io.WAVE_FORMAT_PCM and info.bits_per_sample == 8 else b'\x00'
+    remaining = frames * info.block_align
+    block = silence_byte * min(BLOCK_BYTES, remaining)
+    while remaining:
+        f.write(block[:remaining])
+        remaining -= min(len(block), remaining)
+
+
+# Function to copy a clip's sample data into the render
+def copy_clip_data(f, path, info):
+    with open(path, 'rb') as src:
+        src.seek(info.data_offset)
+        remaining = info.data_size
+        while remaining:
+            block = src.read(min(BLOCK_BYTES, remaining))
+            if not block:
+                raise ValueError(f"{path} ended early")
+            f.write(block)
+            remaining -= len(block)
+
+
+# Function to render the timeline into one WAV file in a single sequential pass. The file is
+# written under a temporary name and moved into place when complete. Returns
+# (sample rate, [TimelineClip], [(path, error)]); progress(done, total) is called per clip.
+def render_timeline(output_path, slide_clips, gap_seconds=0.0, progress=None):
+    reference, timeline, infos, errors = layout_render(slide_clips, gap_seconds)
+    if reference is None:
+        raise ValueError("No usable WAV clips to render")
+    total_frames = int(round(gap_seconds * reference.sample_rate)) * len(slide_clips) + sum(
+        clip.length for clip in timeline)
+    data_size = total_frames * reference.block_align
+
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            wav_io.write_wav_header(f, reference, data_size)
+            position = 0
+            for done, clip in enumerate(timeline, 1):
+                write_silence(f, reference, clip.start - position)
+                copy_clip_data(f, clip.path, infos[clip.path])
+                position = clip.start + clip.length
+                if progress:
+                    progress(done, len(timeline))
+            write_silence(f, reference, total_frames - position)
+            wav_io.write_wav_padding(f, data_size)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return reference.sample_rate, timeline, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the split clips into one WAV in slide order.")
+    parser.add_argument("folders", nargs="+", help="Clip folders (the splitter's output folder works)")
+    parser.add_argument("--output", required=True, help="WAV file to write")
+    parser.add_argument("--cues", help="Cue sheet CSV (default: <output>_cues.csv)")
+    parser.add_argument("--slides", default=session_builder.DEFAULT_SLIDE_FILE,
+                        help="Slide list (default: slide_numbers.txt)")
+    parser.add_argument("--prefix", default="",
+                        help="Title prefix used when splitting (the splitter's default is 1.1.1.1)")
+    parser.add_argument("--gap", type=float, default=0.0, help="Seconds of silence after each slide")
+    args = parser.parse_args(argv)
+
+    slide_numbers = session_builder.load_slide_numbers(args.slides)
+    slide_clips, unmatched = session_builder.match_slide_clips(
+        slide_numbers, session_builder.clip_files(args.folders), args.prefix)
+    try:
+        sample_rate, timeline, errors = render_timeline(args.output, slide_clips, args.gap)
+    except ValueError as e:
+        parser.error(str(e))
+    cues_path = args.cues or os.path.splitext(args.output)[0] + "_cues.csv"
+    session_builder.write_marker_csv(cues_path, timeline, sample_rate)
+
+    empty = [slide for slide, clips in slide_clips if not clips]
+    print(f"Rendered {len(timeline)} clips for {len(slide_numbers)} slides at {sample_rate} Hz to {args.output}.")
+    print(f"Cue sheet: {cues_path}")
+    if empty:
+        print(f"Slides without clips: {', '.join(empty)}", file=sys.stderr)
+    if unmatched:
+        print(f"{len(unmatched)} clips match no slide", file=sys.stderr)
+    for path, error in errors:
+        print(f"Skipped {path}: {error}", file=sys.stderr)
+    return 1 if empty or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
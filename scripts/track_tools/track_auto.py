@@ -9,7 +9,9 @@ import pyautogui
 import time
 import os
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox, simpledialog
+
+import session_builder
 
 # Load slide numbers
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -41,10 +43,43 @@ def start_typing():
     messagebox.showinfo("Done", "All slide numbers have been typed.")
     slide_button.config(state="normal", bg=default_bg)
 
+# Title prefix the splitter puts in front of every clip name by default
+DEFAULT_TITLE_PREFIX = "1.1.1.1"
+
+def export_session():
+    clip_folder = filedialog.askdirectory(title="Select the split clip folder")
+    if not clip_folder:
+        return
+    title_prefix = simpledialog.askstring("Title Prefix", "Title prefix used when splitting:",
+                                          initialvalue=DEFAULT_TITLE_PREFIX)
+    if title_prefix is None:
+        return
+    slide_clips, unmatched = session_builder.match_slide_clips(
+        slide_numbers, session_builder.clip_files([clip_folder]), title_prefix)
+    if not any(clips for _, clips in slide_clips):
+        messagebox.showerror("No Matching Clips",
+                             f"No clip in {clip_folder} matches a slide number with the title prefix "
+                             f"\"{title_prefix}\" ({len(unmatched)} clips found). Check the folder and prefix.")
+        return
+    rpp_path = filedialog.asksaveasfilename(title="Save REAPER project", defaultextension=".rpp",
+                                            filetypes=[("REAPER project", "*.rpp")])
+    if not rpp_path:
+        return
+    sample_rate, timeline, errors = session_builder.layout_timeline(slide_clips)
+    session_builder.write_rpp(rpp_path, slide_numbers, timeline, sample_rate)
+    csv_path = os.path.splitext(rpp_path)[0] + "_markers.csv"
+    session_builder.write_marker_csv(csv_path, timeline, sample_rate)
+    empty = sum(1 for _, clips in slide_clips if not clips)
+    messagebox.showinfo("Session Written",
+                        f"{len(slide_numbers)} tracks, {len(timeline)} clips written to\n{rpp_path}\n"
+                        f"Markers: {csv_path}\n\n"
+                        f"Slides without clips: {empty}, clips matching no slide: {len(unmatched)}, "
+                        f"unreadable clips: {len(errors)}")
+
 # GUI Setup
 root = tk.Tk()
 root.title("Slide Number Typer")
-root.geometry("380x160")
+root.geometry("380x200")
 
 default_bg = root.cget("bg")
 
@@ -57,4 +92,7 @@ track_button.pack(pady=5)
 slide_button = tk.Button(root, text="Start Typing Slides", command=start_typing)
 slide_button.pack(pady=5)
 
+session_button = tk.Button(root, text="Export Session File...", command=export_session)
+session_button.pack(pady=5)
+
 root.mainloop()
\ No newline at end of file